@@ -0,0 +1,135 @@
+"""
+Benchmark for the memory held per device.
+
+Builds DEVICES lights, switches and dimmers and reports the bytes allocated
+per device, compared with the former layout: a __dict__ per Device and
+RemoteValue, and a brightness remote value allocated for every light.
+Run with: python benchmarks/device_memory.py
+"""
+import gc
+import tracemalloc
+
+from teletask.devices import Dimmer, Light, Switch
+
+DEVICES = 10000
+
+
+class Installation:
+    """Minimal Teletask replacement that does not index the devices built."""
+
+    # pylint: disable=too-few-public-methods,no-self-use
+    def register_device(self, device):
+        """Ignore device, only the device objects are measured."""
+
+
+class LegacyRemoteValue:
+    """Former RemoteValue layout, one __dict__ per instance."""
+
+    # pylint: disable=too-few-public-methods,too-many-arguments
+    def __init__(self, teletask, group_address=None, device_name=None, after_update_cb=None,
+                 doip_component=None, **extra):
+        """Initialize LegacyRemoteValue class."""
+        self.teletask = teletask
+        self.doip_component = doip_component
+        self.group_address = group_address
+        self.brightness_val = 0
+        self.after_update_cb = after_update_cb
+        self.device_name = device_name
+        self.payload = None
+        for key, value in extra.items():
+            setattr(self, key, value)
+
+
+class LegacyLight:
+    """Former Light layout, the brightness remote value is always built."""
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, teletask, name, group_address_switch=None, group_address_brightness=None):
+        """Initialize LegacyLight class."""
+        self.teletask = teletask
+        self.doip_component = "RELAY"
+        self.name = name
+        self.device_updated_cbs = []
+        self.light_state = False
+        self.switch = LegacyRemoteValue(teletask, group_address_switch, name, self.after_update,
+                                        "RELAY", invert=False)
+        self.brightness = LegacyRemoteValue(teletask, group_address_brightness, name, self.after_update,
+                                            "DIMMER", range_from=0, range_to=100)
+
+    async def after_update(self):
+        """Stand-in for Device.after_update."""
+
+
+class LegacySwitch:
+    """Former Switch layout."""
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, teletask, name, group_address_switch=None):
+        """Initialize LegacySwitch class."""
+        self.teletask = teletask
+        self.doip_component = "RELAY"
+        self.name = name
+        self.device_updated_cbs = []
+        self.Switch_state = False
+        self.switch = LegacyRemoteValue(teletask, group_address_switch, name, self.after_update,
+                                        "RELAY", invert=False)
+
+    async def after_update(self):
+        """Stand-in for Device.after_update."""
+
+
+class LegacyDimmer:
+    """Former Dimmer layout."""
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, teletask, name, group_address_brightness=None):
+        """Initialize LegacyDimmer class."""
+        self.teletask = teletask
+        self.doip_component = "DIMMER"
+        self.name = name
+        self.device_updated_cbs = []
+        self.light_state = False
+        self.dimmer = LegacyRemoteValue(teletask, group_address_brightness, name, self.after_update,
+                                        "DIMMER", range_from=0, range_to=100)
+
+    async def after_update(self):
+        """Stand-in for Device.after_update."""
+
+
+def measure(build):
+    """Return bytes allocated per device by build."""
+    teletask = Installation()
+    names = ['device{0}'.format(index) for index in range(DEVICES)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    devices = [build(teletask, name, index) for index, name in enumerate(names)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del devices
+    return allocated / DEVICES
+
+
+def main():
+    """Compare bytes per device of the former and the slotted layout."""
+    cases = (
+        ("light", lambda teletask, name, index: LegacyLight(teletask, name, index),
+         lambda teletask, name, index: Light(teletask, name, group_address_switch=index)),
+        ("dimmable light", lambda teletask, name, index: LegacyLight(teletask, name, index, index),
+         lambda teletask, name, index: Light(teletask, name, group_address_switch=index,
+                                             group_address_brightness=index)),
+        ("switch", lambda teletask, name, index: LegacySwitch(teletask, name, index),
+         lambda teletask, name, index: Switch(teletask, name, group_address_switch=index)),
+        ("dimmer", lambda teletask, name, index: LegacyDimmer(teletask, name, index),
+         lambda teletask, name, index: Dimmer(teletask, name, group_address_brightness=index)),
+    )
+    print("{0:<16} {1:>10} {2:>10} {3:>8}".format('device', 'before', 'after', 'saved'))
+    for name, legacy, current in cases:
+        before = measure(legacy)
+        after = measure(current)
+        print("{0:<16} {1:>8.0f} B {2:>8.0f} B {3:>7.0%}".format(name, before, after, 1 - after / before))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for decoding received event reports.
+
+Compares the byte-level FrameQueue/FrameDecoder with the former
+comma-join + regex parser. Run with: python benchmarks/frame_parser.py
+"""
+import re
+import timeit
+
+from teletask.doip import FrameDecoder, FrameQueue
+
+FRAMES_PER_CHUNK = 50
+REPEAT = 5
+NUMBER = 200
+
+
+def legacy_process_frames(raw):
+    """Former implementation of FrameQueue.process_frames."""
+    full_packet = ','.join(str(x) for x in raw)
+    result = []
+    for packet in re.findall(r"(2,9,16,([0-9]*,?){7})", full_packet):
+        event = packet[0].split(",")
+        result.append((int(event[4]), int(event[6]), int(event[8])))
+    return result
+
+
+def build_chunk():
+    """Return a receive buffer holding FRAMES_PER_CHUNK relay event reports."""
+    chunk = bytearray()
+    for address in range(FRAMES_PER_CHUNK):
+        frame = [2, 9, 16, 1, 1, 0, address, 0, 255]
+        frame.append(sum(frame) % 256)
+        chunk += bytes(frame)
+    return bytes(chunk)
+
+
+def report(name, func):
+    """Time func and print decoded frames per second."""
+    best = min(timeit.repeat(func, repeat=REPEAT, number=NUMBER))
+    frames_per_sec = FRAMES_PER_CHUNK * NUMBER / best
+    print("{0:<24} {1:>12,.0f} frames/sec".format(name, frames_per_sec))
+    return frames_per_sec
+
+
+def main():
+    """Run all parsers over the same receive buffer."""
+    chunk = build_chunk()
+    frame_queue = FrameQueue()
+    decoder = FrameDecoder()
+    assert len(legacy_process_frames(chunk)) == FRAMES_PER_CHUNK
+    assert len(frame_queue.process_frames(chunk)) == FRAMES_PER_CHUNK
+    assert len(decoder.feed(chunk)) == FRAMES_PER_CHUNK
+    assert len(decoder.feed_block(chunk)) == FRAMES_PER_CHUNK
+
+    legacy = report("legacy join + regex", lambda: legacy_process_frames(chunk))
+    current = report("FrameQueue", lambda: frame_queue.process_frames(chunk))
+    report("FrameQueue memoryview", lambda: frame_queue.process_frames(memoryview(chunk)))
+    report("FrameDecoder", lambda: decoder.feed(chunk))
+    report("FrameDecoder block", lambda: decoder.feed_block(chunk))
+    print("speedup: {0:.1f}x".format(current / legacy))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for running many sites from one process.
+
+Starts SITES simulated central units and connects a SiteManager to all of
+them on one event loop. Each site then reads the state of OUTPUTS outputs.
+Reports the memory allocated and the CPU time spent per connection.
+Run with: python benchmarks/multi_site.py
+"""
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# pylint: disable=wrong-import-position
+from simulator import CentralUnitSimulator
+from teletask import SiteManager
+from teletask.core import BulkSync
+from teletask.doip import TelegramFunction
+
+SITES = (10, 50, 200)
+OUTPUTS = 50
+
+
+async def run(sites):
+    """Connect sites sites and sync OUTPUTS outputs on each."""
+    loop = asyncio.get_event_loop()
+    units = [CentralUnitSimulator(loop=loop) for _ in range(sites)]
+    for unit in units:
+        await unit.start()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    manager = SiteManager(loop=loop)
+    for index, unit in enumerate(units):
+        manager.add_site('site{0}'.format(index), '127.0.0.1', unit.port)
+    cpu = time.process_time()
+    start = loop.time()
+    await manager.start()
+    connect_time = loop.time() - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    memory = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    outputs = [(TelegramFunction.RELAY, address) for address in range(1, OUTPUTS + 1)]
+    start = loop.time()
+    await asyncio.gather(*(BulkSync(manager[name]).run(outputs) for name in manager))
+    sync_time = loop.time() - start
+    cpu = time.process_time() - cpu
+
+    frames = sum(statistics.frames_received for statistics in manager.statistics().values())
+    print("{0:>6} {1:>10.1f} KiB {2:>10.2f} ms {3:>9.3f} s {4:>9.3f} s {5:>10}".format(
+        sites, memory / sites / 1024, cpu / sites * 1000, connect_time, sync_time, frames))
+    await manager.stop()
+    for unit in units:
+        await unit.stop()
+
+
+async def main():
+    """Compare the cost per connection for a growing number of sites."""
+    print("{0:>6} {1:>14} {2:>13} {3:>11} {4:>11} {5:>10}".format(
+        'sites', 'memory/site', 'cpu/site', 'connect', 'sync', 'frames'))
+    for sites in SITES:
+        await run(sites)
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,60 @@
+"""
+Benchmark driving the outgoing rate limiter against a simulated central unit.
+
+The simulated unit handles CAPACITY commands per second with a small input
+buffer. Each run queues COMMANDS GET telegrams and reports the achieved
+throughput and the number of commands the unit handled instead of dropping.
+Run with: python benchmarks/rate_limiter.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# pylint: disable=wrong-import-position
+from simulator import CentralUnitSimulator
+from teletask import Teletask
+from teletask.doip import Telegram, TelegramCommand, TelegramFunction
+
+CAPACITY = 200
+BUFFER_SIZE = 16
+COMMANDS = 400
+
+
+async def run(rate_limit, rate_burst):
+    """Send COMMANDS telegrams with the given limiter settings."""
+    loop = asyncio.get_event_loop()
+    unit = CentralUnitSimulator(capacity=CAPACITY, buffer_size=BUFFER_SIZE, loop=loop)
+    await unit.start()
+    teletask = Teletask(loop=loop, rate_limit=rate_limit, rate_burst=rate_burst)
+    await teletask.start('127.0.0.1', unit.port)
+
+    start = loop.time()
+    for address in range(COMMANDS):
+        await teletask.telegrams.put(Telegram(command=TelegramCommand.GET, function=TelegramFunction.DIMMER,
+                                              address=address))
+    await teletask.telegrams.join()
+    # Wait until the unit has seen every command.
+    while unit.commands + unit.overruns < COMMANDS:
+        await asyncio.sleep(0.001)
+    elapsed = loop.time() - start
+
+    print("{0:>12} {1:>6} {2:>10.0f}/s {3:>9}/{4}".format(
+        'unlimited' if rate_limit is None else rate_limit, rate_burst,
+        COMMANDS / elapsed, unit.commands, COMMANDS))
+    await teletask.stop()
+    await unit.stop()
+
+
+async def main():
+    """Compare limiter settings below, at and above the unit's capacity."""
+    print("central unit capacity {0}/s, input buffer {1}".format(CAPACITY, BUFFER_SIZE))
+    print("{0:>12} {1:>6} {2:>12} {3:>11}".format('rate_limit', 'burst', 'throughput', 'handled'))
+    for rate_limit, rate_burst in ((None, 1), (CAPACITY * 2, BUFFER_SIZE),
+                                   (CAPACITY, BUFFER_SIZE), (CAPACITY * 0.9, BUFFER_SIZE), (CAPACITY / 2, 1)):
+        await run(rate_limit, rate_burst)
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
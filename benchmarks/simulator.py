@@ -0,0 +1,129 @@
+"""
+Simulated Teletask central unit for benchmarks.
+
+Listens on a local TCP port and answers SET, GROUPSET and GET frames with
+event reports, like a central unit with logging enabled. The unit handles
+`capacity` commands per second; commands arriving while its input buffer
+of `buffer_size` commands is full are counted as overruns and dropped.
+"""
+import asyncio
+
+
+def event_report(function, high, low, state):
+    """Return an event report frame."""
+    frame = [2, 9, 16, 1, function, high, low, 0, state]
+    frame.append(sum(frame) % 256)
+    return bytes(frame)
+
+
+class CentralUnitProtocol(asyncio.Protocol):
+    """Protocol of one connection to the simulated central unit."""
+
+    def __init__(self, unit):
+        """Initialize CentralUnitProtocol class."""
+        self.unit = unit
+        self.transport = None
+        self.buffer = bytearray()
+
+    def connection_made(self, transport):
+        """Keep transport of the new connection."""
+        self.transport = transport
+        self.unit.connections.append(self)
+
+    def connection_lost(self, exc):
+        """Forget the closed connection."""
+        if self in self.unit.connections:
+            self.unit.connections.remove(self)
+
+    def data_received(self, data):
+        """Handle all complete frames received."""
+        self.unit.reads += 1
+        buffer = self.buffer
+        buffer += data
+        position = 0
+        while True:
+            start = buffer.find(2, position)
+            if start < 0 or start + 1 >= len(buffer):
+                position = len(buffer) if start < 0 else start
+                break
+            length = buffer[start + 1]
+            if start + length + 1 > len(buffer):
+                position = start
+                break
+            self.unit.handle(self, bytes(buffer[start:start + length + 1]))
+            position = start + length + 1
+        del buffer[:position]
+
+
+class CentralUnitSimulator:
+    """Class for a simulated central unit."""
+
+    def __init__(self, capacity=None, buffer_size=16, loop=None):
+        """Initialize CentralUnitSimulator class."""
+        self.loop = loop or asyncio.get_event_loop()
+        self.capacity = capacity
+        self.buffer_size = buffer_size
+        self.backlog = 0.0
+        self.updated = self.loop.time()
+        self.connections = []
+        self.server = None
+        self.port = None
+        self.reads = 0
+        self.commands = 0
+        self.overruns = 0
+        self.keepalives = 0
+        self.states = {}
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Start listening, port 0 picks a free port."""
+        self.server = await self.loop.create_server(lambda: CentralUnitProtocol(self), host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Close all connections and stop listening."""
+        for connection in list(self.connections):
+            connection.transport.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _accept(self):
+        """Return if the input buffer can take one more command."""
+        if self.capacity is None:
+            return True
+        now = self.loop.time()
+        self.backlog = max(0.0, self.backlog - (now - self.updated) * self.capacity)
+        self.updated = now
+        if self.backlog + 1 > self.buffer_size:
+            self.overruns += 1
+            return False
+        self.backlog += 1
+        return True
+
+    def handle(self, connection, frame):
+        """Answer a single frame."""
+        command = frame[2]
+        if command == 11:
+            self.keepalives += 1
+            connection.transport.write(b'\x0a')
+            return
+        if command == 3:
+            return
+        if not self._accept():
+            return
+        self.commands += 1
+        function = frame[4]
+        if command == 7:
+            self.states[(function, frame[5], frame[6])] = frame[7]
+            connection.transport.write(event_report(function, frame[5], frame[6], frame[7]))
+        elif command == 6:
+            state = self.states.get((function, frame[5], frame[6]), 0)
+            connection.transport.write(event_report(function, frame[5], frame[6], state))
+        elif command == 9:
+            count = frame[5]
+            state = frame[6 + 2 * count]
+            reports = bytearray()
+            for index in range(count):
+                high, low = frame[6 + 2 * index], frame[7 + 2 * index]
+                self.states[(function, high, low)] = state
+                reports += event_report(function, high, low, state)
+            connection.transport.write(bytes(reports))
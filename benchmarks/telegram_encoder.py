@@ -0,0 +1,46 @@
+"""
+Micro-benchmark for encoding outgoing telegrams.
+
+Compares TelegramEncoder with the former Telegram -> text -> encode() path.
+Run with: python benchmarks/telegram_encoder.py
+"""
+import timeit
+
+from teletask.doip import Telegram, TelegramCommand, TelegramFunction, TelegramSetting, TelegramEncoder
+
+REPEAT = 5
+NUMBER = 20000
+
+
+def report(name, func):
+    """Time func and print encoded telegrams per second."""
+    best = min(timeit.repeat(func, repeat=REPEAT, number=NUMBER))
+    per_sec = NUMBER / best
+    print("{0:<32} {1:>12,.0f} telegrams/sec".format(name, per_sec))
+    return per_sec
+
+
+def main():
+    """Encode the same SET and GET telegrams with both paths."""
+    encoder = TelegramEncoder()
+    set_telegram = Telegram(TelegramCommand.SET, TelegramFunction.RELAY, 32, TelegramSetting.ON)
+    get_telegram = Telegram(TelegramCommand.GET, TelegramFunction.DIMMER, 5)
+
+    legacy = report("SET Telegram text", lambda: str(set_telegram).encode())
+    current = report("SET TelegramEncoder.encode", lambda: encoder.encode(set_telegram))
+    report("SET TelegramEncoder.encode_set", lambda: encoder.encode_set(1, 32, 255))
+    print("SET speedup: {0:.1f}x".format(current / legacy))
+
+    legacy = report("GET Telegram text", lambda: str(get_telegram).encode())
+    current = report("GET TelegramEncoder.encode", lambda: encoder.encode(get_telegram))
+    print("GET speedup: {0:.1f}x".format(current / legacy))
+
+    legacy = report("SET build + text", lambda: str(
+        Telegram(TelegramCommand.SET, TelegramFunction.RELAY, 32, TelegramSetting.ON)).encode())
+    current = report("SET build + encode", lambda: encoder.encode(
+        Telegram(TelegramCommand.SET, TelegramFunction.RELAY, 32, TelegramSetting.ON)))
+    print("build + encode speedup: {0:.1f}x".format(current / legacy))
+
+
+if __name__ == '__main__':
+    main()
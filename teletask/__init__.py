@@ -1,6 +1,7 @@
 """Teletask is a Python 3 library for Teletask/DoIP protocol."""
 # flake8: noqa
 from .client import Teletask
+from .site_manager import SiteManager
 # from .core import TelegramQueue
 # from .devices import Devices
 # from .io import TeletaskDoIPInterface
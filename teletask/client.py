@@ -8,38 +8,104 @@ from sys import platform
 import time
 from concurrent.futures import ProcessPoolExecutor
 
-from teletask.core import TelegramQueue
+from teletask.core import TelegramQueue, TelegramScheduler, IncomingTelegramQueue, QueuePolicy, \
+    GroupSetBatcher, RateLimiter, AcknowledgementTracker, Heartbeat, StateTable, StatePersistence, Config
+from teletask.core.bulk_sync import DEFAULT_WINDOW, DEFAULT_SYNC_TIMEOUT, DEFAULT_RETRIES
+from teletask.core.state_persistence import DEFAULT_SAVE_INTERVAL
 from teletask.devices import Devices
 from teletask.io import TeletaskDoIPInterface
-from teletask.doip import Telegram, TeletaskConst, TelegramCommand, TelegramFunction, TelegramSetting, TelegramHeartbeat
+from teletask.doip import Telegram, TeletaskConst, TelegramCommand, TelegramFunction, TelegramSetting, TelegramHeartbeat, TelegramCache
 
 class Teletask:
     """Class for reading and writing Teletask/DoIP packets."""
     DEFAULT_ADDRESS = ''
+    # Process pool shared by all instances, started on first use.
+    shared_executors = None
 
     def __init__(self,
                  config=None,
                  loop=None,
-                 telegram_received_cb=None):
-
-        """Initialize Teletask class."""
-        self.devices = Devices()
-        self.telegrams = asyncio.Queue()
+                 telegram_received_cb=None,
+                 telegram_cache_size=256,
+                 write_window=0.0,
+                 write_threshold=1024,
+                 rate_limit=None,
+                 rate_burst=10,
+                 function_rate_limits=None,
+                 incoming_queue_size=4096,
+                 incoming_queue_policy=QueuePolicy.BLOCK,
+                 outgoing_queue_size=1024,
+                 outgoing_queue_policy=QueuePolicy.BLOCK,
+                 keepalive_interval=10.0,
+                 keepalive_timeout=5.0,
+                 state_file=None,
+                 state_save_interval=DEFAULT_SAVE_INTERVAL,
+                 auto_reconnect=True,
+                 auto_reconnect_wait=60,
+                 telegram_ttl=30.0,
+                 telegram_cache=None):
+
+        """Initialize Teletask class.
+
+        config is the path of a JSON or YAML site description, see teletask.core.Config.
+        rate_limit and rate_burst bound the telegrams per second sent to the
+        central unit, unlimited by default. Set them to what the central unit
+        handles without overruns. function_rate_limits maps a TelegramFunction
+        to a (rate, burst) budget of its own.
+        The queue sizes bound the inbound and outbound queues (None for
+        unbounded), the policies decide what happens when they are full.
+        A keepalive is sent after keepalive_interval seconds without traffic,
+        the link is considered dead if it is not answered within keepalive_timeout.
+        With a state_file the state table is saved there every state_save_interval
+        seconds and restored from it on the next start, followed by a resync.
+        With auto_reconnect a lost connection is reestablished with backoff up to
+        auto_reconnect_wait seconds, telegrams sent meanwhile are replayed unless
+        older than telegram_ttl seconds.
+        A telegram_cache may be shared by instances connecting to several central units.
+        """
+        # pylint: disable=too-many-arguments
         self.loop = loop or asyncio.get_event_loop()
+        self.telegrams = TelegramScheduler(self.loop, outgoing_queue_size, outgoing_queue_policy)
+        self.incoming_telegrams = IncomingTelegramQueue(self.loop, incoming_queue_size, incoming_queue_policy)
         self.sigint_received = asyncio.Event()
         self.telegram_queue = TelegramQueue(self)
         self.state_updater = None
         self.teletaskip_interface = None
         self.started = False
-        self.executors = ProcessPoolExecutor(2)
-        self.registered_devices = {}
+        self.telegram_cache = telegram_cache if telegram_cache is not None else TelegramCache(telegram_cache_size)
+        self.write_window = write_window
+        self.write_threshold = write_threshold
+        self.rate_limiter = RateLimiter(rate_limit, rate_burst, function_rate_limits, self.loop)
+        self.acknowledgements = AcknowledgementTracker(self.loop)
+        self.heartbeat = Heartbeat(self, keepalive_interval, keepalive_timeout)
+        self.state_table = StateTable()
         self.logger = logging.getLogger('teletask.log')
         self.teletask_logger = logging.getLogger('teletask.teletask')
         self.telegram_logger = logging.getLogger('teletask.telegram')
+        self.devices = Devices(self.loop, self.logger)
+        self.auto_reconnect = auto_reconnect
+        self.auto_reconnect_wait = auto_reconnect_wait
+        self.telegram_ttl = telegram_ttl
+        self.state_persistence = None
+        self.state_restored = False
+        self.resync_task = None
+        if state_file is not None:
+            self.state_persistence = StatePersistence(self, state_file, state_save_interval)
+            self.state_restored = self.state_persistence.load()
 
         if telegram_received_cb is not None:
             self.telegram_queue.register_telegram_received_cb(telegram_received_cb)
 
+        if config is not None:
+            Config(self).read(config)
+
+
+    @property
+    def executors(self):
+        """Return the process pool shared by all instances."""
+        if Teletask.shared_executors is None:
+            Teletask.shared_executors = ProcessPoolExecutor(2)
+        return Teletask.shared_executors
 
     def __del__(self):
         """Destructor. Cleaning up if this was not done before."""
@@ -55,10 +121,16 @@ class Teletask:
                     port=None,
                     daemon_mode=False):
         """Start Teletask module. Connect to Teletask/DoIP devices and start state updater."""
-        self.teletaskip_interface = TeletaskDoIPInterface(self)
-        await self.teletaskip_interface.start(host,port,True,60)
+        self.teletaskip_interface = TeletaskDoIPInterface(self, self.telegram_ttl)
+        await self.teletaskip_interface.start(host, port, self.auto_reconnect, self.auto_reconnect_wait)
+        self.heartbeat.register_dead_link_cb(self.teletaskip_interface.connection_lost)
         await self.telegram_queue.start()
-
+        self.heartbeat.start()
+        if self.state_persistence is not None:
+            self.state_persistence.start()
+            if self.state_restored:
+                # Reconcile the restored state with the central unit.
+                self.resync_task = self.loop.create_task(self.sync())
 
         if daemon_mode:
             await self.loop_until_sigint()
@@ -68,18 +140,27 @@ class Teletask:
     async def join(self):
         """Wait until all telegrams were processed."""
         await self.telegrams.join()
+        await self.incoming_telegrams.join()
 
     async def _stop_teletaskip_interface_if_exists(self):
         """Stop TeletaskIPInterface if initialized."""
         if self.teletaskip_interface is not None:
+            self.heartbeat.unregister_dead_link_cb(self.teletaskip_interface.connection_lost)
             await self.teletaskip_interface.stop()
             self.teletaskip_interface = None
 
     async def stop(self):
         """Stop Teletask module."""
+        if self.resync_task is not None:
+            self.resync_task.cancel()
+            self.resync_task = None
+        await self.heartbeat.stop()
         await self.join()
         await self.telegram_queue.stop()
         await self._stop_teletaskip_interface_if_exists()
+        await self.devices.flush_batch_updated_cbs()
+        if self.state_persistence is not None:
+            await self.state_persistence.stop()
         self.started = False
 
     async def loop_until_sigint(self):
@@ -94,33 +175,57 @@ class Teletask:
         self.logger.warning('Press Ctrl+C to stop')
         await self.sigint_received.wait()
 
+    async def sync(self, window=DEFAULT_WINDOW, timeout=DEFAULT_SYNC_TIMEOUT, retries=DEFAULT_RETRIES):
+        """Read the state of all registered devices from the central unit.
+
+        Return the BulkSync run per Teletask instance, see Devices.sync.
+        """
+        return await self.devices.sync(window, timeout, retries)
+
     async def register_feedback(self):
         telegram = Telegram(command=TelegramCommand.LOG, function=TelegramFunction.RELAY)
-        self.registered_devices["RELAY"] = {}
         await self.telegrams.put(telegram)
-        await asyncio.sleep(1)
 
         telegram = Telegram(command=TelegramCommand.LOG, function=TelegramFunction.DIMMER)
-        self.registered_devices["DIMMER"] = {}
         await self.telegrams.put(telegram)
-        await asyncio.sleep(1)
 
         telegram = Telegram(command=TelegramCommand.LOG, function=TelegramFunction.LOCMOOD)
-        self.registered_devices["LOCMOOD"] = {}
         await self.telegrams.put(telegram)
-        await asyncio.sleep(1)
 
         telegram = Telegram(command=TelegramCommand.LOG, function=TelegramFunction.GENMOOD)
-        self.registered_devices["GENMOOD"] = {}
         await self.telegrams.put(telegram)
-        await asyncio.sleep(1)
 
         telegram = Telegram(command=TelegramCommand.LOG, function=TelegramFunction.FLAG)
-        self.registered_devices["FLAG"] = {}
         await self.telegrams.put(telegram)
-        await asyncio.sleep(1)
 
 
+    async def set_many(self, commands):
+        """Set many outputs at once.
+
+        commands is an iterable of (function, address, setting) tuples.
+        Outputs sharing function and setting are switched with GROUPSET telegrams.
+        """
+        batcher = GroupSetBatcher()
+        telegrams = []
+        for function, address, setting in commands:
+            telegram = Telegram(command=TelegramCommand.SET, function=TelegramFunction(function),
+                                address=int(address), setting=setting)
+            telegrams.extend(batcher.add(telegram))
+        telegrams.extend(batcher.flush())
+        for telegram in telegrams:
+            await self.telegrams.put(telegram)
+
+    def register_high_water_cb(self, high_water_cb):
+        """Register callback called with (queue name, depth) when a queue crosses its high-water mark."""
+        self.incoming_telegrams.limits.register_high_water_cb(high_water_cb)
+        self.telegrams.limits.register_high_water_cb(high_water_cb)
+        return high_water_cb
+
     def register_device(self, device):
-        if device.doip_component in self.registered_devices:
-            self.registered_devices[device.doip_component][device.switch.group_address] = device
\ No newline at end of file
+        """Add device to the registry receiving its state updates."""
+        self.devices.add(device)
+        for remote_value in device.remote_values():
+            if remote_value.output is not None:
+                state = self.state_table.get(*remote_value.output)
+                if state is not None:
+                    remote_value.restore(state)
\ No newline at end of file
@@ -3,5 +3,16 @@
 # flake8: noqa
 # from .stateupdater import StateUpdater
 from .telegram_queue import TelegramQueue
-#from .config import Config
-# from .value_reader import ValueReader
\ No newline at end of file
+from .groupset_batcher import GroupSetBatcher
+from .telegram_scheduler import TelegramScheduler, TelegramPriority
+from .queue_limits import QueueLimits, QueuePolicy
+from .incoming_queue import IncomingTelegramQueue
+from .incoming_dispatcher import IncomingDispatcher
+from .rate_limiter import RateLimiter, TokenBucket
+from .acknowledgements import AcknowledgementTracker
+from .heartbeat import Heartbeat
+from .state_table import StateTable
+from .bulk_sync import BulkSync
+from .state_persistence import StatePersistence
+from .config import Config
+from .value_reader import ValueReader
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Module for awaiting the central unit's confirmation of a command.
+
+A waiter is registered per (function, address) before the command is
+queued. The next event report for that output resolves it and records the
+round-trip time. Each waiter owns its timeout handle, so expiring one
+removes it from its output without scanning the others.
+"""
+import asyncio
+
+from teletask.exceptions import CommandNotAcknowledged
+
+DEFAULT_TIMEOUT = 5.0
+
+
+class AcknowledgementTracker:
+    """Class for matching event reports to commands awaiting confirmation."""
+
+    def __init__(self, loop=None):
+        """Initialize AcknowledgementTracker class."""
+        self.loop = loop or asyncio.get_event_loop()
+        self.waiters = {}
+        self.acknowledged = 0
+        self.expired = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def expect(self, function, address, timeout=DEFAULT_TIMEOUT):
+        """Return a future resolved with the next event report of function and address."""
+        key = (function, address)
+        future = self.loop.create_future()
+        handle = self.loop.call_later(timeout, self._expire, key, future, timeout)
+        self.waiters.setdefault(key, {})[future] = (self.loop.time(), handle)
+        return future
+
+    def _expire(self, key, future, timeout):
+        """Fail a waiter whose timeout passed."""
+        waiters = self.waiters.get(key)
+        if waiters is None or waiters.pop(future, None) is None:
+            return
+        if not waiters:
+            del self.waiters[key]
+        self.expired += 1
+        if not future.done():
+            future.set_exception(CommandNotAcknowledged(key[0], key[1], timeout))
+
+    def cancel(self, function, address, future):
+        """Forget a waiter, e.g. when its command could not be queued."""
+        key = (function, address)
+        waiters = self.waiters.get(key, {})
+        entry = waiters.pop(future, None)
+        if entry is not None:
+            entry[1].cancel()
+            if not waiters:
+                del self.waiters[key]
+        future.cancel()
+
+    def resolve(self, frame):
+        """Resolve all waiters of the output frame reports on."""
+        waiters = self.waiters.pop((frame.doip_component, frame.group_address), None)
+        if waiters is None:
+            return
+        now = self.loop.time()
+        for future, (registered, handle) in waiters.items():
+            handle.cancel()
+            latency = now - registered
+            self.acknowledged += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            if not future.done():
+                future.set_result(frame)
+
+    @property
+    def pending(self):
+        """Return number of waiters not resolved yet."""
+        return sum(len(waiters) for waiters in self.waiters.values())
+
+    @property
+    def average_latency(self):
+        """Return average round-trip time of acknowledged commands."""
+        if not self.acknowledged:
+            return 0.0
+        return self.total_latency / self.acknowledged
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<AcknowledgementTracker pending="{0}" acknowledged="{1}" expired="{2}" ' \
+            'average_latency="{3:.6f}" max_latency="{4:.6f}" />' \
+            .format(self.pending, self.acknowledged, self.expired,
+                    self.average_latency, self.max_latency)
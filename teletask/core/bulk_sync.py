@@ -0,0 +1,89 @@
+"""
+Module for reading the state of many outputs at once.
+
+GET telegrams are sent for all outputs with at most `window` of them
+waiting for their event report, so the answers stream back while further
+requests are queued. Outputs not answered within the timeout are retried
+in further rounds.
+"""
+import asyncio
+from collections import deque
+
+from teletask.doip import Telegram, TelegramCommand, TelegramFunction
+from teletask.exceptions import CommandNotAcknowledged
+
+DEFAULT_WINDOW = 16
+DEFAULT_SYNC_TIMEOUT = 2.0
+DEFAULT_RETRIES = 2
+
+
+class BulkSync:
+    """Class for pipelined state synchronisation of (function, address) outputs."""
+
+    def __init__(self, teletask, window=DEFAULT_WINDOW, timeout=DEFAULT_SYNC_TIMEOUT, retries=DEFAULT_RETRIES):
+        """Initialize BulkSync class."""
+        # pylint: disable=too-many-arguments
+        self.teletask = teletask
+        self.window = max(1, window)
+        self.timeout = timeout
+        self.retries = retries
+        self.synced = {}
+        self.failed = []
+        self.retried = 0
+        self.elapsed = 0.0
+
+    async def run(self, outputs):
+        """Read the state of all (function, address) outputs.
+
+        Return a dict of output to the answering frame. Outputs that never
+        answered are left in failed.
+        """
+        loop = self.teletask.loop
+        start = loop.time()
+        pending = list(dict.fromkeys(
+            (getattr(function, 'value', function), int(address)) for function, address in outputs))
+        total = len(pending)
+        self.synced = {}
+        self.retried = 0
+
+        for attempt in range(self.retries + 1):
+            if not pending:
+                break
+            if attempt:
+                self.retried += len(pending)
+                self.teletask.logger.debug("Retrying sync of %s outputs", len(pending))
+            queue = deque(pending)
+            stragglers = []
+            workers = [self._worker(queue, stragglers) for _ in range(min(self.window, len(queue)))]
+            await asyncio.gather(*workers)
+            pending = stragglers
+
+        self.failed = pending
+        self.elapsed = loop.time() - start
+        self.teletask.logger.info("Synced %s of %s outputs in %.3f seconds",
+                                  len(self.synced), total, self.elapsed)
+        if self.failed:
+            self.teletask.logger.warning("No state received for %s outputs", len(self.failed))
+        return self.synced
+
+    async def _worker(self, queue, stragglers):
+        """Read outputs from queue one after another."""
+        acknowledgements = self.teletask.acknowledgements
+        while queue:
+            function, address = queue.popleft()
+            acknowledgement = acknowledgements.expect(function, address, self.timeout)
+            telegram = Telegram(command=TelegramCommand.GET, function=TelegramFunction(function), address=address)
+            try:
+                await self.teletask.telegrams.put(telegram)
+            except BaseException:
+                acknowledgements.cancel(function, address, acknowledgement)
+                raise
+            try:
+                self.synced[(function, address)] = await acknowledgement
+            except CommandNotAcknowledged:
+                stragglers.append((function, address))
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<BulkSync window="{0}" synced="{1}" failed="{2}" retried="{3}" elapsed="{4:.3f}" />' \
+            .format(self.window, len(self.synced), len(self.failed), self.retried, self.elapsed)
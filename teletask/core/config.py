@@ -0,0 +1,87 @@
+"""
+Module for reading a site description and registering its devices.
+
+The description maps device types to devices by name, each with the
+keyword arguments of its constructor:
+
+    lights:
+      Kitchen: {group_address_switch: 1, group_address_brightness: 2}
+    switches:
+      Fan: {group_address_switch: 5}
+    dimmers:
+      Hall: {group_address_brightness: 3}
+
+Devices are only registered by name and outputs. The Device object is
+built the first time it is looked up. Until then state updates of its
+outputs are kept in the state table only.
+YAML files require the optional PyYAML package, JSON works without it.
+"""
+import inspect
+import json
+from functools import partial
+
+from teletask.devices import Dimmer, Light, Switch
+from teletask.doip import TelegramFunction
+from teletask.exceptions import TeletaskException
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Device class and the (address argument, function) pairs of its outputs per device type.
+# A function of None is taken from the doip_component argument.
+DEVICE_TYPES = {
+    'lights': (Light, (('group_address_switch', None), ('group_address_brightness', 'DIMMER'))),
+    'switches': (Switch, (('group_address_switch', None),)),
+    'dimmers': (Dimmer, (('group_address_brightness', 'DIMMER'),)),
+}
+DEFAULT_DOIP_COMPONENT = 'relay'
+# Constructor signature per device class, to check the arguments of each device.
+SIGNATURES = {device_class: inspect.signature(device_class) for device_class, _ in DEVICE_TYPES.values()}
+
+
+class Config:
+    """Class for parsing a site description and registering its devices lazily."""
+
+    def __init__(self, teletask):
+        """Initialize Config class."""
+        self.teletask = teletask
+
+    def read(self, file='teletask.json'):
+        """Read site description from a JSON or YAML file."""
+        self.teletask.logger.debug("Reading %s", file)
+        with open(file, encoding='utf-8') as filehandle:
+            if file.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    raise TeletaskException("Reading {0} requires PyYAML".format(file))
+                doc = yaml.safe_load(filehandle)
+            else:
+                doc = json.load(filehandle)
+        self.parse(doc or {})
+
+    def parse(self, doc):
+        """Register the devices of a parsed site description."""
+        for device_type, entries in doc.items():
+            if device_type not in DEVICE_TYPES:
+                self.teletask.logger.warning("Unknown device type %s in config", device_type)
+                continue
+            for name, arguments in (entries or {}).items():
+                self.parse_device(device_type, name, arguments or {})
+
+    def parse_device(self, device_type, name, arguments):
+        """Register a single device without building it."""
+        device_class, address_arguments = DEVICE_TYPES[device_type]
+        try:
+            # Checked now, the device is only built when it is looked up.
+            SIGNATURES[device_class].bind(self.teletask, name, **arguments)
+        except TypeError as ex:
+            raise TeletaskException("Invalid arguments for device {0}: {1}".format(name, ex))
+        doip_component = str(arguments.get('doip_component', DEFAULT_DOIP_COMPONENT)).upper()
+        outputs = []
+        for argument, function in address_arguments:
+            address = arguments.get(argument)
+            if address is not None:
+                outputs.append((TelegramFunction[function or doip_component].value, int(address)))
+        factory = partial(device_class, self.teletask, name, **arguments)
+        self.teletask.devices.add_lazy(self.teletask, name, factory, outputs)
@@ -0,0 +1,85 @@
+"""
+Module for folding SET telegrams into GROUPSET telegrams.
+
+SET telegrams with the same function and setting that are sent together
+are replaced by GROUPSET telegrams listing all their addresses, so
+switching many outputs takes a handful of frames.
+"""
+from collections import OrderedDict
+
+from teletask.doip import Telegram, TelegramCommand, TelegramFunction, TelegramSetting
+
+GROUPSET_MAX_ADDRESSES = 32
+
+
+class GroupSetBatcher:
+    """Class for batching SET telegrams into GROUPSET telegrams."""
+
+    def __init__(self, max_addresses=GROUPSET_MAX_ADDRESSES):
+        """Initialize GroupSetBatcher class."""
+        self.max_addresses = max_addresses
+        self.pending = OrderedDict()
+        self.pending_addresses = {}
+        self.sets_folded = 0
+        self.groupsets_sent = 0
+
+    @staticmethod
+    def batchable(telegram):
+        """Return if telegram is a SET that may be folded into a GROUPSET."""
+        return isinstance(telegram, Telegram) \
+            and telegram.command == TelegramCommand.SET.value \
+            and telegram.function is not None
+
+    def add(self, telegram):
+        """Add SET telegram to the batch.
+
+        Return the telegrams that have to be sent before it to keep
+        commands for the same output in order.
+        """
+        key = (telegram.function, telegram.setting)
+        output = (telegram.function, telegram.address)
+        flushed = []
+        pending_key = self.pending_addresses.get(output)
+        if pending_key is not None:
+            if pending_key == key and telegram.setting != TelegramSetting.TOGGLE.value:
+                # Same output and setting already pending.
+                self.sets_folded += 1
+                return flushed
+            flushed = self.flush()
+
+        self.pending.setdefault(key, []).append(telegram.address)
+        self.pending_addresses[output] = key
+        return flushed
+
+    def flush(self):
+        """Return telegrams for everything pending and clear the batch."""
+        telegrams = []
+        for (function, setting), addresses in self.pending.items():
+            telegrams.extend(self.build(function, setting, addresses))
+        self.pending.clear()
+        self.pending_addresses.clear()
+        return telegrams
+
+    def build(self, function, setting, addresses):
+        """Return SET or GROUPSET telegrams setting all addresses of function."""
+        function = TelegramFunction(function)
+        if len(addresses) == 1:
+            return [Telegram(command=TelegramCommand.SET, function=function,
+                             address=addresses[0], setting=setting)]
+
+        telegrams = []
+        for index in range(0, len(addresses), self.max_addresses):
+            chunk = addresses[index:index + self.max_addresses]
+            if len(chunk) == 1:
+                telegrams.append(Telegram(command=TelegramCommand.SET, function=function,
+                                          address=chunk[0], setting=setting))
+                continue
+            telegrams.append(Telegram(command=TelegramCommand.GROUPSET, function=function,
+                                      addresses=chunk, setting=setting))
+            self.groupsets_sent += 1
+            self.sets_folded += len(chunk) - 1
+        return telegrams
+
+    def __len__(self):
+        """Return number of pending addresses."""
+        return len(self.pending_addresses)
@@ -0,0 +1,119 @@
+"""
+Module for keeping the connection to the central unit alive.
+
+The connection stamps every write and every read. A KEEPALIVE is only sent
+once the link was idle in both directions for keepalive_interval seconds,
+so it never competes with real traffic. The first data received after a
+keepalive gives its round-trip time. If nothing arrives within
+keepalive_timeout the link is considered dead and the registered callbacks
+are called, e.g. to reconnect.
+"""
+import asyncio
+
+from teletask.doip import TelegramHeartbeat
+
+
+class Heartbeat:
+    """Class for sending keepalives on an idle connection and detecting a dead link."""
+
+    def __init__(self, teletask, keepalive_interval=10.0, keepalive_timeout=5.0):
+        """Initialize Heartbeat class."""
+        self.teletask = teletask
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_timeout = keepalive_timeout
+        self.dead_link_cbs = []
+        self.task = None
+        self.keepalive_sent = None
+        self.keepalives = 0
+        self.dead_links = 0
+        self.rtt = None
+        self.total_rtt = 0.0
+        self.max_rtt = 0.0
+        self.rtt_samples = 0
+
+    def register_dead_link_cb(self, dead_link_cb):
+        """Register callback called without arguments when the link is considered dead."""
+        self.dead_link_cbs.append(dead_link_cb)
+        return dead_link_cb
+
+    def unregister_dead_link_cb(self, dead_link_cb):
+        """Unregister dead link callback."""
+        self.dead_link_cbs.remove(dead_link_cb)
+
+    def start(self):
+        """Start watching the connection."""
+        if self.task is None:
+            self.keepalive_sent = None
+            self.task = self.teletask.loop.create_task(self.run())
+
+    async def stop(self):
+        """Stop watching the connection."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        """Endless loop sleeping until the connection was idle for long enough."""
+        while True:
+            await asyncio.sleep(await self.check())
+
+    async def check(self):
+        """Send a keepalive or declare the link dead if due. Return seconds until the next check."""
+        interface = self.teletask.teletaskip_interface
+        now = self.teletask.loop.time()
+        if interface is None or not interface.connected or interface.last_received is None:
+            # Reconnecting, the interface watches the link meanwhile.
+            self.keepalive_sent = None
+            return self.keepalive_interval
+
+        if self.keepalive_sent is not None:
+            if interface.last_received >= self.keepalive_sent:
+                self._record_rtt(interface.last_received - self.keepalive_sent)
+                self.keepalive_sent = None
+            elif now - self.keepalive_sent >= self.keepalive_timeout:
+                self.keepalive_sent = None
+                self._dead_link()
+                return self.keepalive_interval
+            else:
+                return self.keepalive_sent + self.keepalive_timeout - now
+
+        last_activity = max(interface.last_received, interface.last_sent or 0.0)
+        idle = now - last_activity
+        if idle < self.keepalive_interval:
+            return self.keepalive_interval - idle
+
+        self.keepalive_sent = now
+        self.keepalives += 1
+        await self.teletask.telegrams.put(TelegramHeartbeat())
+        return self.keepalive_timeout
+
+    def _record_rtt(self, rtt):
+        """Account for the round-trip time of a keepalive."""
+        self.rtt = rtt
+        self.rtt_samples += 1
+        self.total_rtt += rtt
+        self.max_rtt = max(self.max_rtt, rtt)
+
+    def _dead_link(self):
+        """Signal that the central unit stopped answering."""
+        self.dead_links += 1
+        self.teletask.logger.warning("No answer to keepalive within %s seconds, link is dead",
+                                     self.keepalive_timeout)
+        for dead_link_cb in self.dead_link_cbs:
+            dead_link_cb()
+
+    @property
+    def average_rtt(self):
+        """Return average round-trip time of the keepalives."""
+        if not self.rtt_samples:
+            return 0.0
+        return self.total_rtt / self.rtt_samples
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<Heartbeat keepalives="{0}" dead_links="{1}" average_rtt="{2:.6f}" max_rtt="{3:.6f}" />' \
+            .format(self.keepalives, self.dead_links, self.average_rtt, self.max_rtt)
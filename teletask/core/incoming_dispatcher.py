@@ -0,0 +1,99 @@
+"""
+Module for processing the received frames of many Teletask instances in one task.
+
+Every instance keeps its own inbound queue, so backpressure still pauses
+only the connection that is behind. Instead of a task per instance
+waiting on its queue, a queue turning non-empty marks its instance as
+ready and a single task works through the ready instances in turn, at
+most batch_size frames each, so a busy site can not starve the others.
+"""
+import asyncio
+from collections import deque
+
+DEFAULT_BATCH_SIZE = 32
+
+
+class IncomingDispatcher:
+    """Class for dispatching the received frames of many Teletask instances from one task."""
+
+    def __init__(self, loop=None, batch_size=DEFAULT_BATCH_SIZE):
+        """Initialize IncomingDispatcher class."""
+        self.loop = loop or asyncio.get_event_loop()
+        self.batch_size = batch_size
+        self.ready_teletasks = deque()
+        self.scheduled = set()
+        self.task = None
+        self.frames = 0
+        self._ready = asyncio.Event()
+
+    def add(self, teletask):
+        """Process the received frames of teletask from now on."""
+        teletask.telegram_queue.incoming_dispatcher = self
+        teletask.incoming_telegrams.ready_cb = lambda: self.ready(teletask)
+        if not teletask.incoming_telegrams.empty():
+            self.ready(teletask)
+
+    def remove(self, teletask):
+        """Stop processing the received frames of teletask."""
+        teletask.telegram_queue.incoming_dispatcher = None
+        teletask.incoming_telegrams.ready_cb = None
+        if teletask in self.scheduled:
+            self.scheduled.discard(teletask)
+            self.ready_teletasks.remove(teletask)
+
+    def ready(self, teletask):
+        """Schedule teletask, whose inbound queue holds frames. Callback of the queue."""
+        if teletask not in self.scheduled:
+            self.scheduled.add(teletask)
+            self.ready_teletasks.append(teletask)
+            self._ready.set()
+
+    def start(self):
+        """Start processing received frames."""
+        if self.task is None:
+            self.task = self.loop.create_task(self.run())
+
+    async def stop(self):
+        """Stop processing received frames."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        """Endless loop processing the frames of the ready instances in turn."""
+        while True:
+            while not self.ready_teletasks:
+                self._ready.clear()
+                await self._ready.wait()
+            teletask = self.ready_teletasks.popleft()
+            self.scheduled.discard(teletask)
+            await self.process(teletask)
+            if not teletask.incoming_telegrams.empty():
+                self.ready(teletask)
+
+    async def process(self, teletask):
+        """Process up to batch_size queued frames of teletask."""
+        incoming_telegrams = teletask.incoming_telegrams
+        telegram_queue = teletask.telegram_queue
+        for _ in range(self.batch_size):
+            if incoming_telegrams.empty():
+                return
+            telegram = incoming_telegrams.get_nowait()
+
+            # None is pushed to the queue when the instance stops.
+            if telegram is None:
+                incoming_telegrams.task_done()
+                telegram_queue.incoming_queue_stopped.set()
+                return
+
+            await telegram_queue.process_telegram(telegram)
+            incoming_telegrams.task_done()
+            self.frames += 1
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<IncomingDispatcher frames="{0}" ready="{1}" />'.format(self.frames, len(self.ready_teletasks))
@@ -0,0 +1,139 @@
+"""
+Module for the queue of received frames.
+
+Frames are put from the protocol's data_received callback, which can not
+wait. With the BLOCK policy a full queue therefore asks the producer to
+pause reading from the socket and to resume once the queue drained to its
+low-water mark, pushing the backpressure onto TCP. The other policies
+drop frames: the state update queued earlier for the same output, or the
+oldest frame if there is none.
+"""
+import asyncio
+from collections import deque
+
+from .queue_limits import QueueLimits, QueuePolicy
+
+
+class IncomingTelegramQueue:
+    """Class for the bounded FIFO queue of received frames."""
+
+    def __init__(self, loop=None, maxsize=None, policy=QueuePolicy.BLOCK, high_water=None):
+        """Initialize IncomingTelegramQueue class."""
+        self.loop = loop or asyncio.get_event_loop()
+        self.limits = QueueLimits("incoming", maxsize, policy, high_water)
+        self.queue = deque()
+        self.pending_outputs = {}
+        self.pause_producer_cb = None
+        self.resume_producer_cb = None
+        # Called when the queue turns non-empty, for a consumer shared by several queues.
+        self.ready_cb = None
+        self.producer_paused = False
+        self._track_outputs = self.limits.policy is QueuePolicy.DROP_OLDEST_SAME_ADDRESS
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._unfinished = 0
+
+    def put_nowait(self, telegram):
+        """Queue telegram, applying the overflow policy if the queue is full."""
+        limits = self.limits
+        key = None
+        if telegram is not None and self._track_outputs:
+            key = (telegram.doip_component, telegram.group_address)
+            if limits.full(len(self.queue)):
+                entry = self.pending_outputs.get(key)
+                if entry is not None:
+                    # The newer state supersedes the queued one.
+                    entry[0] = telegram
+                    limits.dropped += 1
+                    return
+
+        if telegram is not None and limits.full(len(self.queue)):
+            if limits.policy is QueuePolicy.BLOCK:
+                self._pause_producer()
+            else:
+                self._forget(self.queue.popleft())
+                self._unfinished -= 1
+                limits.dropped += 1
+
+        entry = [telegram, key]
+        if key is not None:
+            self.pending_outputs[key] = entry
+        self.queue.append(entry)
+        self._unfinished += 1
+        self._finished.clear()
+        self._not_empty.set()
+        if self.ready_cb is not None and len(self.queue) == 1:
+            self.ready_cb()
+        limits.update(len(self.queue))
+
+    async def put(self, telegram):
+        """Queue telegram, waiting for room if the queue is full and blocking."""
+        if self.limits.policy is QueuePolicy.BLOCK and self.limits.full(len(self.queue)):
+            self.limits.blocked += 1
+            while self.limits.full(len(self.queue)):
+                self._not_full.clear()
+                await self._not_full.wait()
+        self.put_nowait(telegram)
+
+    def get_nowait(self):
+        """Return the oldest queued telegram."""
+        if not self.queue:
+            raise asyncio.QueueEmpty
+        entry = self.queue.popleft()
+        self._forget(entry)
+        depth = len(self.queue)
+        if not self.limits.full(depth):
+            self._not_full.set()
+        if self.producer_paused and depth <= self.limits.low_water:
+            self._resume_producer()
+        self.limits.update(depth)
+        return entry[0]
+
+    async def get(self):
+        """Wait for and return the oldest queued telegram."""
+        while not self.queue:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def _forget(self, entry):
+        """Remove entry from the index of queued outputs."""
+        key = entry[1]
+        if key is not None and self.pending_outputs.get(key) is entry:
+            del self.pending_outputs[key]
+
+    def _pause_producer(self):
+        """Ask the producer to stop reading."""
+        if not self.producer_paused:
+            self.producer_paused = True
+            self.limits.blocked += 1
+            if self.pause_producer_cb is not None:
+                self.pause_producer_cb()
+
+    def _resume_producer(self):
+        """Let the producer read again."""
+        self.producer_paused = False
+        if self.resume_producer_cb is not None:
+            self.resume_producer_cb()
+
+    def empty(self):
+        """Return if no telegram is waiting."""
+        return not self.queue
+
+    def qsize(self):
+        """Return number of telegrams waiting."""
+        return len(self.queue)
+
+    def task_done(self):
+        """Indicate that a telegram returned by get was processed."""
+        if self._unfinished <= 0:
+            raise ValueError('task_done() called too many times')
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self):
+        """Wait until all queued telegrams were processed."""
+        await self._finished.wait()
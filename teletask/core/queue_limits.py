@@ -0,0 +1,77 @@
+"""
+Module for bounding the telegram queues.
+
+Both the inbound and the outbound queue take a maximum size and a policy
+deciding what happens when it is reached. Crossing the high-water mark
+calls the registered callbacks, so an application can alert before a
+long-running gateway runs out of memory.
+"""
+from enum import Enum
+
+
+class QueuePolicy(Enum):
+    """Enum for the overflow policies of a bounded queue."""
+
+    # Let the producer wait. Received frames pause reading from the socket instead.
+    BLOCK = "block"
+    # Replace the oldest queued telegram of the same (function, address).
+    DROP_OLDEST_SAME_ADDRESS = "drop_oldest_same_address"
+    # Drop queued keepalives first, then block.
+    DROP_KEEPALIVE = "drop_keepalive"
+
+
+class QueueLimits:
+    """Class for the bound, policy and overflow counters of a queue."""
+
+    def __init__(self, name, maxsize=None, policy=QueuePolicy.BLOCK, high_water=None):
+        """Initialize QueueLimits class.
+
+        maxsize None leaves the queue unbounded, high_water defaults to 80% of maxsize.
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = QueuePolicy(policy)
+        if high_water is None and maxsize is not None:
+            high_water = max(1, maxsize * 4 // 5)
+        self.high_water = high_water
+        self.low_water = None if high_water is None else high_water // 2
+        self.high_water_cbs = []
+        self.above_high_water = False
+        self.dropped = 0
+        self.blocked = 0
+        self.high_water_events = 0
+        self.max_depth = 0
+
+    def register_high_water_cb(self, high_water_cb):
+        """Register callback called with (name, depth) when the queue crosses its high-water mark."""
+        self.high_water_cbs.append(high_water_cb)
+        return high_water_cb
+
+    def unregister_high_water_cb(self, high_water_cb):
+        """Unregister high-water callback."""
+        self.high_water_cbs.remove(high_water_cb)
+
+    def full(self, depth):
+        """Return if a queue holding depth telegrams is full."""
+        return self.maxsize is not None and depth >= self.maxsize
+
+    def update(self, depth):
+        """Track depth after a change of the queue and signal the high-water mark."""
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.high_water is None:
+            return
+        if not self.above_high_water and depth >= self.high_water:
+            self.above_high_water = True
+            self.high_water_events += 1
+            for high_water_cb in self.high_water_cbs:
+                high_water_cb(self.name, depth)
+        elif self.above_high_water and depth <= self.low_water:
+            self.above_high_water = False
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<QueueLimits name="{0}" maxsize="{1}" policy="{2}" dropped="{3}" blocked="{4}" ' \
+            'high_water_events="{5}" max_depth="{6}" />' \
+            .format(self.name, self.maxsize, self.policy.value, self.dropped, self.blocked,
+                    self.high_water_events, self.max_depth)
@@ -0,0 +1,88 @@
+"""
+Module for limiting the rate of outgoing telegrams.
+
+The central unit only handles a limited number of commands per second.
+A token bucket for all telegrams, optionally combined with a bucket per
+TelegramFunction, keeps the outgoing path within that budget while still
+allowing short bursts.
+"""
+import asyncio
+
+from teletask.doip import TelegramFunction
+
+
+class TokenBucket:
+    """Class for a token bucket refilling rate tokens per second up to burst."""
+
+    def __init__(self, rate, burst=1, loop=None):
+        """Initialize TokenBucket class."""
+        self.loop = loop or asyncio.get_event_loop()
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self.tokens = self.burst
+        self.updated = self.loop.time()
+
+    def _refill(self):
+        """Add the tokens earned since the last update."""
+        now = self.loop.time()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take a token if one is available and return if it was."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        """Wait for a token and take it. Return the time waited."""
+        if self.try_acquire():
+            return 0.0
+        start = self.loop.time()
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+        return self.loop.time() - start
+
+
+class RateLimiter:
+    """Class for limiting outgoing telegrams to the capacity of the central unit.
+
+    rate and burst apply to all telegrams, function_budgets maps a
+    TelegramFunction to a (rate, burst) tuple of its own. A rate of None
+    leaves the telegrams unlimited.
+    """
+
+    def __init__(self, rate=None, burst=1, function_budgets=None, loop=None):
+        """Initialize RateLimiter class."""
+        self.loop = loop or asyncio.get_event_loop()
+        self.bucket = None if rate is None else TokenBucket(rate, burst, self.loop)
+        self.function_buckets = {}
+        for function, (function_rate, function_burst) in (function_budgets or {}).items():
+            self.function_buckets[TelegramFunction(function).value] = \
+                TokenBucket(function_rate, function_burst, self.loop)
+        self.telegrams = 0
+        self.throttled = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    async def acquire(self, telegram):
+        """Wait until telegram may be sent to the central unit."""
+        delay = 0.0
+        function_bucket = self.function_buckets.get(getattr(telegram, 'function', None))
+        if function_bucket is not None:
+            delay += await function_bucket.acquire()
+        if self.bucket is not None:
+            delay += await self.bucket.acquire()
+
+        self.telegrams += 1
+        if delay > 0:
+            self.throttled += 1
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<RateLimiter telegrams="{0}" throttled="{1}" total_delay="{2:.3f}" max_delay="{3:.3f}" />' \
+            .format(self.telegrams, self.throttled, self.total_delay, self.max_delay)
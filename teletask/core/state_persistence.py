@@ -0,0 +1,143 @@
+"""
+Module for persisting the state table across restarts.
+
+The snapshot file is a small header followed by one fixed-size record per
+output that reported: function, address, state and time of the report.
+It is written to a temporary file and moved over the old one with
+os.replace, so a crash never leaves a half-written snapshot behind. The
+state table is copied on the event loop, the file is written in an
+executor so the fsync does not hold up the loop. It is read back through
+a memory map.
+"""
+import asyncio
+import mmap
+import os
+import struct
+
+MAGIC = b'TTST'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+RECORD = struct.Struct('<BHHd')
+DEFAULT_SAVE_INTERVAL = 60.0
+
+
+def write_snapshot(path, columns):
+    """Write the outputs that reported to path atomically. Return the number of outputs written.
+
+    columns is a dict of function to (states, timestamps) as returned by StateTable.snapshot.
+    """
+    records = bytearray()
+    count = 0
+    for function, (states, timestamps) in columns.items():
+        for address, timestamp in enumerate(timestamps):
+            if timestamp:
+                records += RECORD.pack(function, address, states[address], timestamp)
+                count += 1
+    temporary = '{0}.tmp'.format(path)
+    with open(temporary, 'wb') as snapshot:
+        snapshot.write(HEADER.pack(MAGIC, VERSION, count))
+        snapshot.write(records)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+    os.replace(temporary, path)
+    return count
+
+
+def load_snapshot(path, state_table):
+    """Load the outputs stored in path into state_table. Return the number of outputs loaded.
+
+    Raise ValueError if the file is not a valid snapshot.
+    """
+    with open(path, 'rb') as snapshot:
+        if os.fstat(snapshot.fileno()).st_size < HEADER.size:
+            raise ValueError("snapshot too short")
+        with mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version, count = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a state snapshot")
+            end = HEADER.size + count * RECORD.size
+            if len(data) < end:
+                raise ValueError("snapshot truncated")
+            # Unpacked in place, the views are released before the map closes.
+            with memoryview(data) as view, view[HEADER.size:end] as records:
+                for function, address, state, timestamp in RECORD.iter_unpack(records):
+                    state_table.update(function, address, state, timestamp)
+    return count
+
+
+class StatePersistence:
+    """Class for saving the state table periodically and restoring it at startup."""
+
+    def __init__(self, teletask, path, save_interval=DEFAULT_SAVE_INTERVAL):
+        """Initialize StatePersistence class."""
+        self.teletask = teletask
+        self.path = path
+        self.save_interval = save_interval
+        self.task = None
+        self.write = None
+        self.loaded = 0
+        self.saves = 0
+        self.saved_changes = None
+
+    def load(self):
+        """Restore the state table from the snapshot file. Return if a snapshot was loaded."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            self.loaded = load_snapshot(self.path, self.teletask.state_table)
+        except (OSError, ValueError, struct.error) as ex:
+            self.teletask.logger.warning("Could not load state snapshot %s: %s", self.path, ex)
+            return False
+        self.saved_changes = self.teletask.state_table.changes
+        self.teletask.logger.info("Loaded state of %s outputs from %s", self.loaded, self.path)
+        return True
+
+    async def save(self):
+        """Write the state table to the snapshot file if it changed since the last save."""
+        state_table = self.teletask.state_table
+        changes = state_table.changes
+        if self.saved_changes == changes:
+            return
+        columns = state_table.snapshot()
+        self.write = self.teletask.loop.run_in_executor(None, write_snapshot, self.path, columns)
+        try:
+            # Shielded, so stop can wait for a write in progress instead of racing it.
+            await asyncio.shield(self.write)
+        except OSError as ex:
+            self.teletask.logger.warning("Could not save state snapshot %s: %s", self.path, ex)
+            return
+        finally:
+            if self.write.done():
+                self.write = None
+        self.saved_changes = changes
+        self.saves += 1
+
+    def start(self):
+        """Start saving periodically."""
+        if self.task is None:
+            self.task = self.teletask.loop.create_task(self.run())
+
+    async def stop(self):
+        """Stop saving periodically and save a last time."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.write is not None:
+            await asyncio.wait([self.write])
+            self.write = None
+        await self.save()
+
+    async def run(self):
+        """Endless loop saving the state table every save_interval seconds."""
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.save()
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<StatePersistence path="{0}" loaded="{1}" saves="{2}" />' \
+            .format(self.path, self.loaded, self.saves)
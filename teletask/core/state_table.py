@@ -0,0 +1,118 @@
+"""
+Module for the current state of every output of the installation.
+
+Teletask addresses are small integers, so the state of each function is
+kept in array columns indexed by address: one for the state and one for
+the time of its last update. A zero timestamp marks an address that
+never reported. The columns of a function are allocated when it first
+reports and grow when a higher address reports.
+"""
+import time
+from array import array
+
+from teletask.doip import TelegramFunction
+
+TABLE_FUNCTIONS = (
+    TelegramFunction.RELAY,
+    TelegramFunction.DIMMER,
+    TelegramFunction.FLAG,
+    TelegramFunction.LOCMOOD,
+    TelegramFunction.GENMOOD,
+    TelegramFunction.SENSOR,
+)
+DEFAULT_SIZE = 256
+MAX_ADDRESS = 0xFFFF
+
+
+class StateTable:
+    """Class for the array-backed state of all outputs, per function."""
+
+    class Column:
+        """States and update times of the addresses of one function."""
+
+        __slots__ = ('states', 'timestamps')
+
+        def __init__(self, size):
+            """Initialize Column class."""
+            self.states = array('H', bytes(2 * size))
+            self.timestamps = array('d', bytes(8 * size))
+
+        def grow(self, address):
+            """Make room for address, doubling the size of the columns."""
+            size = len(self.states)
+            while size <= address:
+                size *= 2
+            size = min(size, MAX_ADDRESS + 1)
+            extra = size - len(self.states)
+            self.states.frombytes(bytes(2 * extra))
+            self.timestamps.frombytes(bytes(8 * extra))
+
+    def __init__(self, size=DEFAULT_SIZE, functions=TABLE_FUNCTIONS):
+        """Initialize StateTable class."""
+        self.size = size
+        self.functions = frozenset(function.value for function in functions)
+        self.columns = {}
+        self.updates = 0
+        self.changes = 0
+
+    def update(self, function, address, state, timestamp=None):
+        """Store state of function and address. Return if it changed.
+
+        Functions not kept in the table and addresses out of range are ignored.
+        """
+        if address is None or not 0 <= address <= MAX_ADDRESS:
+            return False
+        column = self.columns.get(function)
+        if column is None:
+            if function not in self.functions:
+                return False
+            column = self.columns[function] = StateTable.Column(self.size)
+        if address >= len(column.states):
+            column.grow(address)
+        self.updates += 1
+        changed = column.states[address] != state or not column.timestamps[address]
+        column.states[address] = state
+        column.timestamps[address] = time.time() if timestamp is None else timestamp
+        if changed:
+            self.changes += 1
+        return changed
+
+    def get(self, function, address):
+        """Return state of function and address, None if it never reported."""
+        column = self.columns.get(getattr(function, 'value', function))
+        if column is None or not 0 <= address < len(column.states) or not column.timestamps[address]:
+            return None
+        return column.states[address]
+
+    def updated_at(self, function, address):
+        """Return time of the last update of function and address, None if it never reported."""
+        column = self.columns.get(getattr(function, 'value', function))
+        if column is None or not 0 <= address < len(column.states) or not column.timestamps[address]:
+            return None
+        return column.timestamps[address]
+
+    def items(self):
+        """Yield (function, address, state, timestamp) of every output that reported."""
+        for function, column in self.columns.items():
+            timestamps = column.timestamps
+            for address, state in enumerate(column.states):
+                if timestamps[address]:
+                    yield function, address, state, timestamps[address]
+
+    def snapshot(self):
+        """Return copies of the columns as a dict of function to (states, timestamps).
+
+        The copies are taken without yielding to the loop, so they are consistent
+        with each other.
+        """
+        return {function: (array('H', column.states), array('d', column.timestamps))
+                for function, column in self.columns.items()}
+
+    def __len__(self):
+        """Return number of outputs that reported."""
+        return sum(1 for column in self.columns.values() for timestamp in column.timestamps if timestamp)
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<StateTable outputs="{0}" updates="{1}" changes="{2}" />' \
+            .format(len(self), self.updates, self.changes)
@@ -2,88 +2,283 @@
 Module for queing telegrams.
 When a device wants to sends a telegram to the Teletask bus, it has to queue it to the TelegramQueue within XTeletask.
 The underlaying TeletaskIPInterface will poll the queue and send the packets to the correct Teletask/IP abstraction (Tunneling or Routing).
+Received frames travel through a separate inbound queue, so incoming and outgoing traffic do not hold each other up.
 You may register callbacks to be notified if a telegram was pushed to the queue.
+Callbacks may subscribe to a subset of the received frames by function, address
+and state. Subscriptions are kept in a dispatch index keyed by (function, address),
+so a frame only costs the subscribers interested in its output.
 """
 import asyncio
+from collections import deque
 
-from teletask.doip import Telegram, TelegramFunction, TelegramCommand, TelegramHeartbeat
+from teletask.doip import Frame, Telegram, TelegramFunction, TelegramCommand
 from teletask.exceptions import TeletaskException
 
+from .groupset_batcher import GroupSetBatcher
+
+DEFAULT_CALLBACK_TIMEOUT = 2.0
+DEFAULT_ERROR_BUDGET = 10
+# Frames waiting for a single callback, the oldest are dropped beyond it.
+DEFAULT_CALLBACK_BACKLOG = 256
+# Address ranges up to this many addresses are expanded into the dispatch index.
+MAX_INDEXED_ADDRESSES = 256
+
 
 class TelegramQueue():
     """Class for telegram queue."""
 
     class Callback:
         """Callback class for handling telegram received callbacks."""
-        def __init__(self, callback):
-            """Initialize Callback class."""
+        # pylint: disable=too-many-arguments
+        def __init__(self, callback, timeout=DEFAULT_CALLBACK_TIMEOUT, error_budget=DEFAULT_ERROR_BUDGET,
+                     functions=None, addresses=None, states=None):
+            """Initialize Callback class.
+
+            functions, addresses and states of None match everything. addresses holds
+            addresses, ranges or inclusive (first, last) tuples.
+            """
             self.callback = callback
+            self.functions = None if functions is None else \
+                frozenset(getattr(function, 'value', function) for function in functions)
+            self.address_ranges = None if addresses is None else \
+                tuple(TelegramQueue.Callback.address_range(address) for address in addresses)
+            self.states = None if states is None else \
+                frozenset(getattr(state, 'value', state) for state in states)
+            self.timeout = timeout
+            self.error_budget = error_budget
+            self.backlog = deque(maxlen=DEFAULT_CALLBACK_BACKLOG)
+            self.task = None
+            self.dropped = 0
+            self.calls = 0
+            self.errors = 0
+            self.timeouts = 0
+            self.total_time = 0.0
+            self.max_time = 0.0
+            self.disabled = False
+
+        @staticmethod
+        def address_range(address):
+            """Return address, range or (first, last) tuple as a range."""
+            if isinstance(address, range):
+                return address
+            if isinstance(address, tuple):
+                first, last = address
+                return range(int(first), int(last) + 1)
+            return range(int(address), int(address) + 1)
+
+        @property
+        def addresses(self):
+            """Return the number of addresses matched, None if all are."""
+            if self.address_ranges is None:
+                return None
+            return sum(len(address_range) for address_range in self.address_ranges)
+
+        def match_address(self, address):
+            """Return if address is within the subscribed ranges."""
+            if self.address_ranges is None:
+                return True
+            for address_range in self.address_ranges:
+                if address in address_range:
+                    return True
+            return False
 
+        def match(self, telegram):
+            """Return if telegram passes all filters of the subscription."""
+            return (self.functions is None or telegram.doip_component in self.functions) and \
+                self.match_address(telegram.group_address) and \
+                (self.states is None or telegram.state in self.states)
+
+        @property
+        def average_time(self):
+            """Return average execution time of the callback."""
+            if not self.calls:
+                return 0.0
+            return self.total_time / self.calls
+
+        def __str__(self):
+            """Return object as readable string."""
+            return '<Callback callback="{0}" calls="{1}" errors="{2}" timeouts="{3}" dropped="{4}" ' \
+                'average_time="{5:.6f}" max_time="{6:.6f}" disabled="{7}" />' \
+                .format(getattr(self.callback, '__qualname__', self.callback), self.calls, self.errors,
+                        self.timeouts, self.dropped, self.average_time, self.max_time, self.disabled)
 
     def __init__(self, teletask):
         """Initialize TelegramQueue class."""
         self.teletask = teletask
         self.telegram_received_cbs = []
+        # Subscriptions to single outputs, to all addresses of a function, and to
+        # everything else. Those in the last two lists check their address filter per frame.
+        self.output_subscriptions = {}
+        self.function_subscriptions = {}
+        self.wildcard_subscriptions = []
+        self.dispatch_cache = {}
         self.queue_stopped = asyncio.Event()
+        self.incoming_queue_stopped = asyncio.Event()
+        self.groupset_batcher = GroupSetBatcher()
+        # Set if the received frames are processed by an IncomingDispatcher shared with other instances.
+        self.incoming_dispatcher = None
 
-    def register_telegram_received_cb(self, telegram_received_cb):
-        """Register callback for a telegram beeing received from Teletask bus."""
-        callback = TelegramQueue.Callback(telegram_received_cb)
-        self.telegram_received_cbs.append(callback)
-        return callback
+    def register_telegram_received_cb(self, telegram_received_cb,
+                                      timeout=DEFAULT_CALLBACK_TIMEOUT, error_budget=DEFAULT_ERROR_BUDGET):
+        """Register callback for a telegram beeing received from Teletask bus.
+
+        A call taking longer than timeout seconds is abandoned. After more than
+        error_budget failed or abandoned calls the callback is disabled.
+        """
+        return self.subscribe(telegram_received_cb, timeout=timeout, error_budget=error_budget)
 
     def unregister_telegram_received_cb(self, telegram_received_cb):
         """Unregister callback for a telegram beeing received from Teletask bus."""
-        self.telegram_received_cbs.remove(telegram_received_cb)
+        self.unsubscribe(telegram_received_cb)
+
+    # pylint: disable=too-many-arguments
+    def subscribe(self, telegram_received_cb, functions=None, addresses=None, states=None,
+                  timeout=DEFAULT_CALLBACK_TIMEOUT, error_budget=DEFAULT_ERROR_BUDGET):
+        """Register callback for the received frames matching functions, addresses and states.
+
+        addresses holds addresses, ranges or inclusive (first, last) tuples.
+        None matches everything. Return the subscription for unsubscribe.
+        """
+        callback = TelegramQueue.Callback(telegram_received_cb, timeout, error_budget,
+                                          functions, addresses, states)
+        self.telegram_received_cbs.append(callback)
+        for index, key in self._index_keys(callback):
+            index.setdefault(key, []).append(callback)
+        if callback.functions is None:
+            self.wildcard_subscriptions.append(callback)
+        self.dispatch_cache.clear()
+        return callback
+
+    def unsubscribe(self, callback):
+        """Unregister subscription returned by subscribe."""
+        self.telegram_received_cbs.remove(callback)
+        for index, key in self._index_keys(callback):
+            subscriptions = index[key]
+            subscriptions.remove(callback)
+            if not subscriptions:
+                del index[key]
+        if callback.functions is None:
+            self.wildcard_subscriptions.remove(callback)
+        self.dispatch_cache.clear()
+
+    def _index_keys(self, callback):
+        """Yield (index, key) pairs under which callback is indexed."""
+        if callback.functions is None:
+            return
+        addresses = callback.addresses
+        for function in callback.functions:
+            if addresses is None or addresses > MAX_INDEXED_ADDRESSES:
+                yield self.function_subscriptions, function
+            else:
+                for address_range in callback.address_ranges:
+                    for address in address_range:
+                        yield self.output_subscriptions, (function, address)
+
+    def subscriptions_for(self, function, address):
+        """Return the subscriptions possibly interested in frames of function and address."""
+        key = (function, address)
+        subscriptions = self.dispatch_cache.get(key)
+        if subscriptions is None:
+            subscriptions = self.output_subscriptions.get(key, []) + \
+                [callback for callback in self.function_subscriptions.get(function, ())
+                 if callback.match_address(address)] + \
+                [callback for callback in self.wildcard_subscriptions if callback.match_address(address)]
+            # Keep the order of registration.
+            subscriptions = tuple(callback for callback in self.telegram_received_cbs if callback in subscriptions) \
+                if len(subscriptions) > 1 else tuple(subscriptions)
+            self.dispatch_cache[key] = subscriptions
+        return subscriptions
 
     async def start(self):
         """Start telegram queue."""
         self.teletask.loop.create_task(self.run())
-        asyncio.ensure_future(self.start_heartbeat())
-
-
-    async def start_heartbeat(self):
-        # your infinite loop here, for example:
-        while True:
-            telegram = TelegramHeartbeat()
-            await self.teletask.telegrams.put(telegram)
-            await asyncio.sleep(10)
+        if self.incoming_dispatcher is None:
+            self.teletask.loop.create_task(self.run_incoming())
 
     async def run(self):
-        """Endless loop for processing telegrams."""
+        """Endless loop for processing outgoing telegrams."""
+        telegrams = self.teletask.telegrams
+        batchable = self.groupset_batcher.batchable
         while True:
-            telegram = await self.teletask.telegrams.get()
-            #asyncio.ensure_future(self.start())
+            telegram = await telegrams.get()
+
+            # Breaking up queue if None is pushed to the queue
+            if telegram is None:
+                telegrams.task_done()
+                break
 
+            # Fold the SETs queued right behind it into GROUPSETs. Anything else is
+            # taken one at a time, so the scheduler decides again before every send.
+            batch = [telegram]
+            if batchable(telegram):
+                while batchable(telegrams.peek()):
+                    batch.append(telegrams.get_nowait())
+
+            await self.process_telegrams(batch)
+            for _ in batch:
+                telegrams.task_done()
+
+        self.queue_stopped.set()
 
+    async def run_incoming(self):
+        """Endless loop for processing incoming telegrams."""
+        incoming_telegrams = self.teletask.incoming_telegrams
+        while True:
+            telegram = await incoming_telegrams.get()
 
             # Breaking up queue if None is pushed to the queue
             if telegram is None:
+                incoming_telegrams.task_done()
                 break
 
             await self.process_telegram(telegram)
-            self.teletask.telegrams.task_done()
+            incoming_telegrams.task_done()
 
-        self.queue_stopped.set()
+        self.incoming_queue_stopped.set()
 
     async def stop(self):
         """Stop telegram queue."""
         self.teletask.logger.debug("Stopping TelegramQueue")
         # If a None object is pushed to the queue, the queue stops
         await self.teletask.telegrams.put(None)
+        await self.teletask.incoming_telegrams.put(None)
         await self.queue_stopped.wait()
+        await self.incoming_queue_stopped.wait()
+        await self.join_callbacks()
 
     async def process_all_telegrams(self):
         """Process all telegrams being queued."""
+        incoming_telegrams = self.teletask.incoming_telegrams
+        while not incoming_telegrams.empty():
+            await self.process_telegram(incoming_telegrams.get_nowait())
+            incoming_telegrams.task_done()
+        await self.join_callbacks()
+
+        batch = []
         while not self.teletask.telegrams.empty():
-            telegram = self.teletask.telegrams.get_nowait()
-            await self.process_telegram(telegram)
+            batch.append(self.teletask.telegrams.get_nowait())
+        await self.process_telegrams(batch)
+        for _ in batch:
             self.teletask.telegrams.task_done()
 
+    async def process_telegrams(self, telegrams):
+        """Process telegrams in order, folding SETs into GROUPSETs where possible."""
+        batcher = self.groupset_batcher
+        for telegram in telegrams:
+            if batcher.batchable(telegram):
+                for flushed in batcher.add(telegram):
+                    await self.process_telegram(flushed)
+                continue
+            for flushed in batcher.flush():
+                await self.process_telegram(flushed)
+            await self.process_telegram(telegram)
+        for flushed in batcher.flush():
+            await self.process_telegram(flushed)
+
     async def process_telegram(self, telegram):
         """Process telegram."""
         try:
-            if str(type(telegram)) == "<class 'teletask.doip.frame.Frame'>":
+            if isinstance(telegram, Frame):
                 await self.process_telegram_incoming(telegram)
             else:
                 await self.process_telegram_outgoing(telegram)
@@ -93,28 +288,77 @@ class TelegramQueue():
     async def process_telegram_outgoing(self, telegram):
         """Process outgoing telegram."""
         if self.teletask.teletaskip_interface is not None:
+            await self.teletask.rate_limiter.acquire(telegram)
             await self.teletask.teletaskip_interface.send_telegram(telegram)
         else:
             self.teletask.logger.warning("No TeletaskIP interface defined")
 
     async def process_telegram_incoming(self, telegram):
         """Process incoming telegram."""
-        processed = False
-        for telegram_received_cb in self.telegram_received_cbs:
-            if(telegram.doip_component != None):
-                await self.update_component_state(doip_component=telegram.doip_component, group_address=telegram.group_address, state=telegram.state)
-                ret = await telegram_received_cb.callback(telegram)
-                if ret:
-                    processed = True
+        self.teletask.acknowledgements.resolve(telegram)
+        if telegram.doip_component is None:
+            return
+        self.teletask.state_table.update(telegram.doip_component, telegram.group_address, telegram.state)
+        await self.update_component_state(doip_component=telegram.doip_component, group_address=telegram.group_address, state=telegram.state)
+
+        for callback in self.subscriptions_for(telegram.doip_component, telegram.group_address):
+            if not callback.disabled and (callback.states is None or telegram.state in callback.states):
+                self.dispatch(callback, telegram)
+
+    def dispatch(self, callback, telegram):
+        """Queue telegram for callback without waiting for it.
+
+        Each callback works off its own backlog in a task, so a slow callback
+        only delays itself and never the processing of received frames.
+        """
+        if len(callback.backlog) == callback.backlog.maxlen:
+            callback.dropped += 1
+        callback.backlog.append(telegram)
+        if callback.task is None:
+            callback.task = self.teletask.loop.create_task(self.run_callbacks(callback))
+
+    async def run_callbacks(self, callback):
+        """Run callback for the telegrams in its backlog until it is empty."""
+        try:
+            while callback.backlog and not callback.disabled:
+                await self.run_callback(callback, callback.backlog.popleft())
+            callback.backlog.clear()
+        finally:
+            callback.task = None
+
+    async def join_callbacks(self):
+        """Wait until all callbacks processed their backlog."""
+        tasks = [callback.task for callback in self.telegram_received_cbs if callback.task is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_callback(self, callback, telegram):
+        """Run a telegram received callback within its timeout and account for it."""
+        loop = self.teletask.loop
+        start = loop.time()
+        try:
+            await asyncio.wait_for(callback.callback(telegram), callback.timeout)
+        except asyncio.TimeoutError:
+            callback.timeouts += 1
+            self.teletask.logger.warning("Telegram received callback %s timed out", callback)
+        except Exception as ex:
+            callback.errors += 1
+            self.teletask.logger.error("Error in telegram received callback %s: %s", callback, ex)
+        finally:
+            elapsed = loop.time() - start
+            callback.calls += 1
+            callback.total_time += elapsed
+            callback.max_time = max(callback.max_time, elapsed)
+
+        if callback.errors + callback.timeouts > callback.error_budget and not callback.disabled:
+            callback.disabled = True
+            self.teletask.logger.error("Disabled telegram received callback %s, error budget exceeded", callback)
 
     async def update_component_state(self, doip_component, group_address, state):
-        doip_component_name = (TelegramFunction(doip_component).name)
-
-        if(doip_component_name != 'None'):
-            if(doip_component_name in self.teletask.registered_devices and group_address != None):
-                try:
-                    remote = self.teletask.registered_devices[doip_component_name][str(group_address)]
-                    await remote.change_state(state)
-                except:
-                    self.teletask.logger.debug("Received an update from an Unknown or Unregistered component")
-                    self.teletask.logger.debug("Name: " + doip_component_name + ", Address: " + str(group_address) + ", State: " + state)
\ No newline at end of file
+        """Update the remote values reporting on doip_component and group_address."""
+        remote_values = self.teletask.devices.remote_values_by_output(doip_component, group_address)
+        if not remote_values:
+            self.teletask.logger.debug("Received an update from an Unknown or Unregistered component")
+            self.teletask.logger.debug("Function: %s, Address: %s, State: %s", doip_component, group_address, state)
+        for _, remote_value in remote_values:
+            await remote_value.state(state)
@@ -0,0 +1,227 @@
+"""
+Module for scheduling outgoing telegrams.
+
+Outgoing telegrams are dispatched by priority: interactive commands first,
+then state requests, then keepalives and feedback registrations.
+The TelegramScheduler offers the interface of an asyncio.Queue, so devices
+keep queuing their telegrams with `await teletask.telegrams.put(telegram)`.
+At most one SET per (function, address) is pending: a newer SET replaces the
+setting of the pending one in place, so a slider does not replay every
+intermediate value.
+A full scheduler applies its QueuePolicy: producers wait for room, or
+queued keepalives or telegrams for the same output are dropped first.
+"""
+import asyncio
+from collections import deque
+from enum import IntEnum
+
+from teletask.doip import TelegramCommand, TelegramSetting
+
+from .queue_limits import QueueLimits, QueuePolicy
+
+SET = TelegramCommand.SET.value
+KEEPALIVE = TelegramCommand.KEEPALIVE.value
+TOGGLE = TelegramSetting.TOGGLE.value
+
+
+class TelegramPriority(IntEnum):
+    """Enum for the priority classes of outgoing telegrams."""
+
+    INTERACTIVE = 0
+    STATE = 1
+    BACKGROUND = 2
+
+
+COMMAND_PRIORITIES = {
+    TelegramCommand.SET.value: TelegramPriority.INTERACTIVE,
+    TelegramCommand.GROUPSET.value: TelegramPriority.INTERACTIVE,
+    TelegramCommand.GET.value: TelegramPriority.STATE,
+    TelegramCommand.LOG.value: TelegramPriority.BACKGROUND,
+    TelegramCommand.KEEPALIVE.value: TelegramPriority.BACKGROUND,
+}
+
+
+class TelegramScheduler:
+    """Class for the priority queue of outgoing telegrams."""
+
+    class Statistics:
+        """Queue depth and wait times of one priority class."""
+
+        def __init__(self, priority, queue):
+            """Initialize Statistics class."""
+            self.priority = priority
+            self.queue = queue
+            self.enqueued = 0
+            self.dispatched = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+        @property
+        def depth(self):
+            """Return number of telegrams waiting in this class."""
+            return len(self.queue)
+
+        @property
+        def average_wait(self):
+            """Return average time a telegram of this class waited for dispatch."""
+            if not self.dispatched:
+                return 0.0
+            return self.total_wait / self.dispatched
+
+        def __str__(self):
+            """Return object as readable string."""
+            return '<Statistics priority="{0}" depth="{1}" enqueued="{2}" dispatched="{3}" ' \
+                'average_wait="{4:.6f}" max_wait="{5:.6f}" />' \
+                .format(self.priority.name, self.depth, self.enqueued, self.dispatched,
+                        self.average_wait, self.max_wait)
+
+    def __init__(self, loop=None, maxsize=None, policy=QueuePolicy.BLOCK, high_water=None):
+        """Initialize TelegramScheduler class."""
+        self.loop = loop or asyncio.get_event_loop()
+        self.limits = QueueLimits("outgoing", maxsize, policy, high_water)
+        self.queues = [deque() for _ in TelegramPriority]
+        self.statistics = [TelegramScheduler.Statistics(priority, self.queues[priority])
+                           for priority in TelegramPriority]
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._unfinished = 0
+        self.pending_sets = {}
+        self.coalesced = 0
+
+    @staticmethod
+    def priority_of(telegram):
+        """Return the priority class of telegram."""
+        if telegram is None:
+            return TelegramPriority.BACKGROUND
+        return COMMAND_PRIORITIES.get(getattr(telegram, 'command', None), TelegramPriority.INTERACTIVE)
+
+    def put_nowait(self, telegram, priority=None):
+        """Queue telegram, in its own priority class unless priority is given.
+
+        Raise asyncio.QueueFull if the scheduler is full and its policy finds nothing to drop.
+        """
+        if priority is None:
+            priority = self.priority_of(telegram)
+
+        command = getattr(telegram, 'command', None)
+        key = None
+        if command == SET:
+            key = (telegram.function, telegram.address)
+            entry = self.pending_sets.get(key)
+            # A TOGGLE depends on the state before it, it can not replace anything.
+            if entry is not None and telegram.setting != TOGGLE:
+                entry[0] = telegram
+                self.coalesced += 1
+                return
+
+        if telegram is not None and self.limits.full(self.qsize()) and not self._make_room(telegram, command):
+            if self.limits.policy is QueuePolicy.DROP_KEEPALIVE and command == KEEPALIVE:
+                self.limits.dropped += 1
+                return
+            raise asyncio.QueueFull
+
+        entry = [telegram, self.loop.time(), key]
+        if key is not None:
+            self.pending_sets[key] = entry
+        self.queues[priority].append(entry)
+        self.statistics[priority].enqueued += 1
+        self._unfinished += 1
+        self._finished.clear()
+        self._not_empty.set()
+        self.limits.update(self.qsize())
+
+    async def put(self, telegram, priority=None):
+        """Queue telegram, in its own priority class unless priority is given.
+
+        Wait for room if the scheduler is full.
+        """
+        blocked = False
+        while True:
+            try:
+                self.put_nowait(telegram, priority)
+                return
+            except asyncio.QueueFull:
+                if not blocked:
+                    blocked = True
+                    self.limits.blocked += 1
+                self._not_full.clear()
+                await self._not_full.wait()
+
+    def _make_room(self, telegram, command):
+        """Drop a queued telegram according to the policy. Return if room was made."""
+        policy = self.limits.policy
+        if policy is QueuePolicy.DROP_KEEPALIVE:
+            return self._drop_first(lambda queued: getattr(queued, 'command', None) == KEEPALIVE)
+        if policy is QueuePolicy.DROP_OLDEST_SAME_ADDRESS and getattr(telegram, 'address', None) is not None:
+            output = (telegram.function, telegram.address)
+            return self._drop_first(
+                lambda queued: (getattr(queued, 'function', None), getattr(queued, 'address', None)) == output)
+        return False
+
+    def _drop_first(self, predicate):
+        """Drop the oldest queued telegram matching predicate, lowest priority first."""
+        for queue in reversed(self.queues):
+            for entry in queue:
+                if entry[0] is not None and predicate(entry[0]):
+                    queue.remove(entry)
+                    if entry[2] is not None and self.pending_sets.get(entry[2]) is entry:
+                        del self.pending_sets[entry[2]]
+                    self.limits.dropped += 1
+                    self.task_done()
+                    return True
+        return False
+
+    def get_nowait(self):
+        """Return the next telegram of the highest priority class waiting."""
+        for priority, queue in enumerate(self.queues):
+            if queue:
+                entry = queue.popleft()
+                telegram, enqueued_at, key = entry
+                if key is not None and self.pending_sets.get(key) is entry:
+                    del self.pending_sets[key]
+                wait = self.loop.time() - enqueued_at
+                statistics = self.statistics[priority]
+                statistics.dispatched += 1
+                statistics.total_wait += wait
+                if wait > statistics.max_wait:
+                    statistics.max_wait = wait
+                self._not_full.set()
+                self.limits.update(self.qsize())
+                return telegram
+        raise asyncio.QueueEmpty
+
+    def peek(self):
+        """Return the telegram get_nowait would return next without removing it, None if empty."""
+        for queue in self.queues:
+            if queue:
+                return queue[0][0]
+        return None
+
+    async def get(self):
+        """Wait for and return the next telegram of the highest priority class waiting."""
+        while self.empty():
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def empty(self):
+        """Return if no telegram is waiting."""
+        return not any(self.queues)
+
+    def qsize(self):
+        """Return number of telegrams waiting."""
+        return sum(len(queue) for queue in self.queues)
+
+    def task_done(self):
+        """Indicate that a telegram returned by get was processed."""
+        if self._unfinished <= 0:
+            raise ValueError('task_done() called too many times')
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self):
+        """Wait until all queued telegrams were processed."""
+        await self._finished.wait()
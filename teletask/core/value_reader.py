@@ -0,0 +1,40 @@
+"""
+Module for reading the state of a single output from the central unit.
+
+A GET telegram is sent and the event report answering it is awaited
+through the acknowledgement tracker.
+"""
+from teletask.doip import Telegram, TelegramCommand, TelegramFunction
+from teletask.exceptions import CommandNotAcknowledged
+
+from .acknowledgements import DEFAULT_TIMEOUT
+
+
+class ValueReader:
+    """Class for reading the state of an output."""
+
+    def __init__(self, teletask, function, group_address, timeout_in_seconds=DEFAULT_TIMEOUT):
+        """Initialize ValueReader class."""
+        self.teletask = teletask
+        self.function = TelegramFunction(getattr(function, 'value', function))
+        self.group_address = int(group_address)
+        self.timeout_in_seconds = timeout_in_seconds
+
+    async def read(self):
+        """Send GET telegram and return the event report answering it, None on timeout."""
+        acknowledgement = self.teletask.acknowledgements.expect(
+            self.function.value, self.group_address, self.timeout_in_seconds)
+        try:
+            await self.send_group_read()
+        except BaseException:
+            self.teletask.acknowledgements.cancel(self.function.value, self.group_address, acknowledgement)
+            raise
+        try:
+            return await acknowledgement
+        except CommandNotAcknowledged:
+            return None
+
+    async def send_group_read(self):
+        """Send GET telegram without waiting for the answer."""
+        telegram = Telegram(command=TelegramCommand.GET, function=self.function, address=self.group_address)
+        await self.teletask.telegrams.put(telegram)
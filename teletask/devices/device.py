@@ -9,6 +9,10 @@ from teletask.doip import Telegram#, TelegramType
 class Device:
     """Base class for devices."""
 
+    __slots__ = ('teletask', 'doip_component', 'name', 'device_updated_cbs')
+    # Slots left out of the equal operator.
+    uncompared = ('device_updated_cbs',)
+
     def __init__(self, teletask, name, device_updated_cb=None):
         """Initialize Device class."""
         self.teletask = teletask
@@ -40,15 +44,17 @@ class Device:
 
     async def _sync_impl(self, wait_for_result=True):
         self.teletask.logger.debug("Sync %s", self.name)
-        for group_address in self.state_addresses():
-            from teletask.core import ValueReader
-            value_reader = ValueReader(self.teletask, group_address)
+        from teletask.core import ValueReader
+        for remote_value in self.remote_values():
+            if remote_value.output is None:
+                continue
+            value_reader = ValueReader(self.teletask, *remote_value.output)
             if wait_for_result:
                 telegram = await value_reader.read()
                 if telegram is not None:
                     await self.process(telegram)
                 else:
-                    self.teletask.logger.warning("Could not read value of %s %s", self, group_address)
+                    self.teletask.logger.warning("Could not read value of %s %s", self, remote_value.group_address)
             else:
                 await value_reader.send_group_read()
 
@@ -66,6 +72,18 @@ class Device:
         # pylint: disable=no-self-use
         return []
 
+    def remote_values(self):
+        """Return the remote values of the device."""
+        # pylint: disable=no-self-use
+        return []
+
+    def has_group_address(self, group_address):
+        """Test if device has given group address."""
+        for remote_value in self.remote_values():
+            if remote_value.has_group_address(group_address):
+                return True
+        return False
+
     async def process(self, telegram):
         """Process incoming telegram."""
         pass
@@ -92,6 +110,20 @@ class Device:
         # The dafault is, that devices dont answer to group reads
         pass
 
+    def fields(self):
+        """Return the values compared by the equal operator."""
+        return tuple(getattr(self, name, None)
+                     for cls in type(self).__mro__ for name in getattr(cls, '__slots__', ())
+                     if name not in self.uncompared)
+
+    def __eq__(self, other):
+        """Equal operator."""
+        return type(self) is type(other) and self.fields() == other.fields()
+
+    def __hash__(self):
+        """Hash by class and name, devices comparing equal share both."""
+        return hash((type(self), self.name))
+
     def get_name(self):
         """Return name of device."""
         return self.name
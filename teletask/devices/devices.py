@@ -1,17 +1,106 @@
 """
 Module for handling a vector/array of devices.
 More or less an array with devices. Adds some search functionality to find devices.
+Devices are indexed by name and every remote value by (function, address),
+so a received state update finds its devices without scanning.
+Devices added lazily are only built when they are looked up.
+Besides per-device callbacks, batch callbacks receive all devices updated
+within a window at once.
 """
+import asyncio
+import logging
+
+from teletask.core.bulk_sync import BulkSync, DEFAULT_WINDOW, DEFAULT_SYNC_TIMEOUT, DEFAULT_RETRIES
+
 from .device import Device
 
+DEFAULT_BATCH_WINDOW = 0.05
+
 
 class Devices:
     """Class for handling a vector/array of devices."""
 
-    def __init__(self):
-        """Initialize Devices class."""
+    class BatchCallback:
+        """Callback receiving the devices updated within a window as one dict of device to state."""
+
+        def __init__(self, callback, window=DEFAULT_BATCH_WINDOW, loop=None, logger=None):
+            """Initialize BatchCallback class."""
+            self.callback = callback
+            self.window = window
+            self.loop = loop or asyncio.get_event_loop()
+            self.logger = logger or logging.getLogger('teletask.log')
+            self.pending = {}
+            self.handle = None
+            self.task = None
+            self.batches = 0
+            self.updates = 0
+
+        def add(self, device):
+            """Collect the state of device, scheduling delivery at the end of the window."""
+            self.pending[device] = getattr(device, 'state', None)
+            self.updates += 1
+            if self.handle is None:
+                self.handle = self.loop.call_later(self.window, self.window_ended)
+
+        def window_ended(self):
+            """Start delivering the collected states, once the previous delivery finished."""
+            self.handle = None
+            if self.task is not None:
+                self.handle = self.loop.call_later(self.window, self.window_ended)
+                return
+            self.task = self.loop.create_task(self.flush())
+            self.task.add_done_callback(self.flushed)
+
+        def flushed(self, task):
+            """Log the exception of a delivery. Callback of the flush task."""
+            self.task = None
+            if not task.cancelled() and task.exception() is not None:
+                self.logger.error("Error in batch updated callback %s: %s", self.callback, task.exception())
+
+        async def flush(self):
+            """Deliver the collected states."""
+            if self.handle is not None:
+                self.handle.cancel()
+                self.handle = None
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+            self.batches += 1
+            await self.callback(batch)
+
+        async def stop(self):
+            """Wait for a running delivery, then deliver the remaining states."""
+            if self.handle is not None:
+                self.handle.cancel()
+                self.handle = None
+            if self.task is not None:
+                await asyncio.wait([self.task])
+            try:
+                await self.flush()
+            except Exception as ex:
+                self.logger.error("Error in batch updated callback %s: %s", self.callback, ex)
+
+        def cancel(self):
+            """Drop the collected states and cancel a running delivery."""
+            if self.handle is not None:
+                self.handle.cancel()
+                self.handle = None
+            if self.task is not None:
+                self.task.cancel()
+            self.pending = {}
+
+    def __init__(self, loop=None, logger=None):
+        """Initialize Devices class. Batch callbacks run on loop and log their errors to logger."""
+        self.loop = loop
+        self.logger = logger
         self.__devices = []
+        self.__devices_by_name = {}
+        self.__remote_values = {}
+        self.__devices_by_address = {}
+        self.__lazy_devices = {}
+        self.__lazy_names_by_address = {}
         self.device_updated_cbs = []
+        self.batch_updated_cbs = []
 
     def register_device_updated_cb(self, device_updated_cb):
         """Register callback for devices beeing updated."""
@@ -21,49 +110,148 @@ class Devices:
         """Unregister callback for devices beeing updated."""
         self.device_updated_cbs.remove(device_updated_cb)
 
+    def register_batch_updated_cb(self, batch_updated_cb, window=DEFAULT_BATCH_WINDOW):
+        """Register callback for the devices updated within window seconds, as a dict of device to state."""
+        callback = Devices.BatchCallback(batch_updated_cb, window, self.loop, self.logger)
+        self.batch_updated_cbs.append(callback)
+        return callback
+
+    def unregister_batch_updated_cb(self, callback):
+        """Unregister callback returned by register_batch_updated_cb."""
+        callback.cancel()
+        self.batch_updated_cbs.remove(callback)
+
+    async def flush_batch_updated_cbs(self):
+        """Deliver the pending batches without waiting for their windows to end."""
+        for callback in self.batch_updated_cbs:
+            await callback.stop()
+
     def __iter__(self):
         """Iterator."""
+        self.materialize_all()
         yield from self.__devices
 
-    def devices_by_group_address(self, group_address):
-        """Return device(s) by group address."""
-        for device in self.__devices:
-            if device.has_group_address(group_address):
-                yield device
+    def devices_by_group_address(self, group_address, function=None):
+        """Return device(s) by group address, of any function unless function is given."""
+        for name in list(self.__lazy_names_by_address.get(int(group_address), ())):
+            self.materialize(name)
+        if function is None:
+            yield from self.__devices_by_address.get(int(group_address), ())
+            return
+        devices = []
+        for device, _ in self.__remote_values.get((getattr(function, 'value', function), int(group_address)), ()):
+            if device not in devices:
+                devices.append(device)
+        yield from devices
+
+    def remote_values_by_output(self, function, group_address):
+        """Return (device, remote value) pairs of function and group address."""
+        return self.__remote_values.get((function, group_address), ())
 
     def __getitem__(self, key):
         """Return device by name or by index."""
-        for device in self.__devices:
-            if device.name == key:
-                return device
+        device = self.__devices_by_name.get(key)
+        if device is not None:
+            return device
+        if key in self.__lazy_devices:
+            return self.materialize(key)
         if isinstance(key, int):
+            self.materialize_all()
             return self.__devices[key]
         raise KeyError
 
     def __len__(self):
         """Return number of devices within vector."""
-        return len(self.__devices)
+        return len(self.__devices) + len(self.__lazy_devices)
 
     def __contains__(self, key):
         """Return if devices with name 'key' is within devices."""
-        for device in self.__devices:
-            if device.name == key:
-                return True
-        return False
+        return key in self.__devices_by_name or key in self.__lazy_devices
+
+    def add_lazy(self, teletask, name, factory, outputs):
+        """Add device to be built by factory on first access.
+
+        outputs are the (function, address) pairs of the device, so it can be
+        found by address and synced before it is built.
+        """
+        self.__lazy_devices[name] = (teletask, factory, tuple(outputs))
+        for _, address in outputs:
+            self.__lazy_names_by_address.setdefault(address, []).append(name)
+
+    def materialize(self, name):
+        """Build the lazily added device name and return it."""
+        _, factory, _ = self.__lazy_devices[name]
+        device = factory()
+        # Devices register themselves, unless built for another Teletask instance.
+        # Adding drops the lazy entry, it is kept if building the device fails.
+        self.add(device)
+        return device
+
+    def materialize_all(self):
+        """Build all lazily added devices."""
+        for name in list(self.__lazy_devices):
+            self.materialize(name)
+
+    def _forget_lazy(self, name, outputs):
+        """Remove name from the address index of lazy devices."""
+        for _, address in outputs:
+            names = self.__lazy_names_by_address.get(address)
+            if names is not None and name in names:
+                names.remove(name)
+                if not names:
+                    del self.__lazy_names_by_address[address]
 
     def add(self, device):
         """Add device to devices vector."""
         if not isinstance(device, Device):
             raise TypeError()
+        if self.__devices_by_name.get(device.name) is device:
+            return
+        lazy = self.__lazy_devices.pop(device.name, None)
+        if lazy is not None:
+            self._forget_lazy(device.name, lazy[2])
         device.register_device_updated_cb(self.device_updated)
         self.__devices.append(device)
+        self.__devices_by_name.setdefault(device.name, device)
+        for remote_value in device.remote_values():
+            key = remote_value.output
+            if key is not None:
+                self.__remote_values.setdefault(key, []).append((device, remote_value))
+                devices = self.__devices_by_address.setdefault(key[1], [])
+                if device not in devices:
+                    devices.append(device)
 
     async def device_updated(self, device):
         """Call all registered device updated callbacks of device."""
         for device_updated_cb in self.device_updated_cbs:
             await device_updated_cb(device)
+        for batch_updated_cb in self.batch_updated_cbs:
+            batch_updated_cb.add(device)
+
+    def outputs(self):
+        """Return the (function, address) outputs of all remote values, built or not."""
+        outputs = list(self.__remote_values)
+        for _, _, lazy_outputs in self.__lazy_devices.values():
+            outputs.extend(lazy_outputs)
+        return outputs
+
+    async def sync(self, window=DEFAULT_WINDOW, timeout=DEFAULT_SYNC_TIMEOUT, retries=DEFAULT_RETRIES):
+        """Read state of devices from Teletask bus.
 
-    async def sync(self):
-        """Read state of devices from Teletask bus."""
-        for device in self.__devices:
-            await device.sync()
\ No newline at end of file
+        Up to window GET telegrams wait for their answer at a time, outputs not
+        answered within timeout seconds are retried up to retries times.
+        Return the BulkSync run for each Teletask instance, reporting its
+        synced and failed outputs, retries and elapsed time.
+        """
+        outputs = {}
+        for (function, address), remote_values in self.__remote_values.items():
+            for device, _ in remote_values:
+                outputs.setdefault(device.teletask, []).append((function, address))
+        for teletask, _, lazy_outputs in self.__lazy_devices.values():
+            outputs.setdefault(teletask, []).extend(lazy_outputs)
+        syncs = []
+        for teletask, teletask_outputs in outputs.items():
+            bulk_sync = BulkSync(teletask, window, timeout, retries)
+            await bulk_sync.run(teletask_outputs)
+            syncs.append(bulk_sync)
+        return syncs
@@ -3,6 +3,8 @@ Module for managing a dimmer via Teletask.
 It provides functionality for
 * switching dimmer 'on' and 'off'.
 """
+from teletask.core.acknowledgements import DEFAULT_TIMEOUT
+
 from .device import Device
 from .remote_value_dimmer import RemoteValueDimmer
 
@@ -10,6 +12,8 @@ from .remote_value_dimmer import RemoteValueDimmer
 class Dimmer(Device):
     """Class for managing a Dimmer."""
 
+    __slots__ = ('light_state', 'dimmer')
+
     def __init__(self,
                  teletask,
                  name,
@@ -58,31 +62,31 @@ class Dimmer(Device):
         """Return the current switch state of the device."""
         return self.dimmer.value != RemoteValueDimmer.Value.OFF
 
-    async def set_on(self):
+    async def set_on(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Switch light on."""
-        await self.dimmer.on()
+        return await self.dimmer.on(confirm, timeout)
 
-    async def set_off(self):
+    async def set_off(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Switch light off."""
-        await self.dimmer.off()
+        return await self.dimmer.off(confirm, timeout)
 
     @property
     def current_brightness(self):
         """Return current brightness of light."""
         return self.dimmer.value
 
-    async def set_brightness(self, brightness):
+    async def set_brightness(self, brightness, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Set brightness of light."""
         if not self.supports_brightness:
             self.teletask.logger.warning("Dimming not supported for device %s", self.get_name())
-            return
-        await self.dimmer.set(brightness)
+            return None
+        return await self.dimmer.set(brightness, confirm, timeout)
 
     async def change_state(self,value):
         await self.dimmer.state(value)
 
-    async def current_state(self):
-        await self.dimmer.current_state()
+    async def current_state(self, confirm=False, timeout=DEFAULT_TIMEOUT):
+        return await self.dimmer.current_state(confirm, timeout)
 
     async def do(self, action):
         """Execute 'do' commands."""
@@ -95,9 +99,6 @@ class Dimmer(Device):
         else:
             self.teletask.logger.debug("Could not understand action %s for device %s", action, self.get_name())
 
-    def has_group_address(self, var):
-        return False
-
-    def __eq__(self, other):
-        """Equal operator."""
-        return self.__dict__ == other.__dict__
\ No newline at end of file
+    def remote_values(self):
+        """Return the remote values of the device."""
+        return [self.dimmer]
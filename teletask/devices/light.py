@@ -3,6 +3,8 @@ Module for managing a light via Teletask.
 It provides functionality for
 * switching light 'on' and 'off'.
 """
+from teletask.core.acknowledgements import DEFAULT_TIMEOUT
+
 from .device import Device
 from .remote_value_switch import RemoteValueSwitch
 from .remote_value_scaling import RemoteValueScaling
@@ -11,6 +13,10 @@ from .remote_value_scaling import RemoteValueScaling
 class Light(Device):
     """Class for managing a light."""
 
+    __slots__ = ('light_state', 'switch', '_brightness')
+    # Built lazily, compared by its address in fields().
+    uncompared = Device.uncompared + ('_brightness',)
+
     def __init__(self,
                  teletask,
                  name,
@@ -35,8 +41,17 @@ class Light(Device):
             doip_component=self.doip_component)
 
 
-        self.brightness = RemoteValueScaling(
-            teletask,
+        # Only built on access if the light has no dimmer.
+        self._brightness = None
+        if group_address_brightness is not None:
+            self._brightness = self._create_brightness(group_address_brightness)
+
+        self.teletask.register_device(self)
+
+    def _create_brightness(self, group_address_brightness=None):
+        """Return the remote value of the dimmer of the light."""
+        return RemoteValueScaling(
+            self.teletask,
             group_address=group_address_brightness,
             device_name=self.name,
             after_update_cb=self.after_update,
@@ -44,7 +59,17 @@ class Light(Device):
             range_to=100,
             doip_component="DIMMER")
 
-        self.teletask.register_device(self)
+    def fields(self):
+        """Return the values compared by the equal operator, the brightness by the address of its dimmer."""
+        brightness = None if self._brightness is None else self._brightness.group_address
+        return super(Light, self).fields() + (brightness,)
+
+    @property
+    def brightness(self):
+        """Return the remote value of the dimmer of the light."""
+        if self._brightness is None:
+            self._brightness = self._create_brightness()
+        return self._brightness
 
     def __str__(self):
         """Return object as readable string."""
@@ -62,38 +87,38 @@ class Light(Device):
     @property
     def supports_brightness(self):
         """Return if light supports brightness."""
-        return self.brightness.initialized
+        return self._brightness is not None and self._brightness.initialized
 
     @property
     def state(self):
         """Return the current switch state of the device."""
         return self.switch.value == RemoteValueSwitch.Value.ON
 
-    async def set_on(self):
+    async def set_on(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Switch light on."""
-        await self.switch.on()
+        return await self.switch.on(confirm, timeout)
 
-    async def set_off(self):
+    async def set_off(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Switch light off."""
-        await self.switch.off()
+        return await self.switch.off(confirm, timeout)
 
     @property
     def current_brightness(self):
         """Return current brightness of light."""
         return self.brightness.value
 
-    async def set_brightness(self, brightness):
+    async def set_brightness(self, brightness, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Set brightness of light."""
         if not self.supports_brightness:
             self.teletask.logger.warning("Dimming not supported for device %s", self.get_name())
-            return
-        await self.brightness.set(brightness)
+            return None
+        return await self.brightness.set(brightness, confirm, timeout)
 
     async def change_state(self,value):
         await self.switch.state(value)
 
-    async def current_state(self):
-        await self.switch.current_state()
+    async def current_state(self, confirm=False, timeout=DEFAULT_TIMEOUT):
+        return await self.switch.current_state(confirm, timeout)
 
     async def do(self, action):
         """Execute 'do' commands."""
@@ -106,9 +131,8 @@ class Light(Device):
         else:
             self.teletask.logger.debug("Could not understand action %s for device %s", action, self.get_name())
 
-    def has_group_address(self, var):
-        return False
-
-    def __eq__(self, other):
-        """Equal operator."""
-        return self.__dict__ == other.__dict__
\ No newline at end of file
+    def remote_values(self):
+        """Return the remote values of the device."""
+        if self._brightness is None:
+            return [self.switch]
+        return [self.switch, self._brightness]
@@ -7,11 +7,15 @@ or a group address for both.
 """
 # from teletask.exceptions import CouldNotParseTelegram
 from teletask.doip import Telegram, TeletaskConst, TelegramCommand, TelegramFunction, TelegramSetting#, TelegramType
+from teletask.core.acknowledgements import DEFAULT_TIMEOUT
 import asyncio
 
 class RemoteValue():
     """Class for managing remote teletask value."""
 
+    __slots__ = ('teletask', 'doip_component', 'group_address', 'brightness_val',
+                 'after_update_cb', 'device_name', 'payload')
+
     def __init__(self,
                  teletask,
                  group_address=None,
@@ -36,7 +40,16 @@ class RemoteValue():
 
     def has_group_address(self, group_address):
         """Test if device has given group address."""
-        return (self.group_address == group_address)
+        if not self.initialized or group_address is None:
+            return False
+        return int(self.group_address) == int(group_address)
+
+    @property
+    def output(self):
+        """Return (function, address) of the remote value as reported in event reports."""
+        if not self.initialized or self.doip_component not in TelegramFunction.__members__:
+            return None
+        return (TelegramFunction[self.doip_component].value, int(self.group_address))
 
     def state_addresses(self):
         """Return group addresses which should be requested to sync state."""
@@ -84,11 +97,33 @@ class RemoteValue():
             return None
         return self.from_teletask(self.payload)
 
-    async def current_state(self):
-        """Send payload as telegram to Teletask bus."""
+    def expect_acknowledgement(self, timeout=DEFAULT_TIMEOUT):
+        """Return a future resolved by the next event report of this remote value."""
+        function = TelegramFunction[self.doip_component].value
+        return self.teletask.acknowledgements.expect(function, int(self.group_address), timeout)
+
+    def cancel_acknowledgement(self, acknowledgement):
+        """Forget a future returned by expect_acknowledgement."""
+        if acknowledgement is not None:
+            function = TelegramFunction[self.doip_component].value
+            self.teletask.acknowledgements.cancel(function, int(self.group_address), acknowledgement)
+
+    async def current_state(self, confirm=False, timeout=DEFAULT_TIMEOUT):
+        """Send payload as telegram to Teletask bus.
+
+        With confirm, wait up to timeout seconds for the event report answering it.
+        """
         function = TelegramFunction[self.doip_component]
         telegram = Telegram(command=TelegramCommand.GET, address=int(self.group_address), function=function)
-        await self.teletask.telegrams.put(telegram)
+        acknowledgement = self.expect_acknowledgement(timeout) if confirm else None
+        try:
+            await self.teletask.telegrams.put(telegram)
+        except BaseException:
+            self.cancel_acknowledgement(acknowledgement)
+            raise
+        if acknowledgement is not None:
+            return await acknowledgement
+        return None
 
     async def send(self, receivedSetting=TelegramSetting.TOGGLE.value, response=False):
         """Send payload as telegram to Teletask bus."""
@@ -105,11 +140,15 @@ class RemoteValue():
         telegram = Telegram(command=TelegramCommand.SET, function=function,  address=int(self.group_address), setting=setting)
         await self.teletask.telegrams.put(telegram)
 
-    async def set(self, value):
-        """Set new value."""
+    async def set(self, value, confirm=False, timeout=DEFAULT_TIMEOUT):
+        """Set new value.
+
+        With confirm, wait up to timeout seconds for the event report
+        confirming it and return that frame.
+        """
         if not self.initialized:
             self.teletask.logger.info("Setting value of uninitialized device %s (value %s)", self.device_name, value)
-            return
+            return None
 
         payload = self.to_teletask(value)
         updated = False
@@ -120,16 +159,32 @@ class RemoteValue():
         if value != None:
             self.brightness_val  = value
 
-        await self.send()
+        acknowledgement = self.expect_acknowledgement(timeout) if confirm else None
+        try:
+            await self.send()
+        except BaseException:
+            self.cancel_acknowledgement(acknowledgement)
+            raise
         if updated and self.after_update_cb is not None:
             await self.after_update_cb()
+        if acknowledgement is not None:
+            return await acknowledgement
+        return None
+
+    def from_state(self, raw_value):
+        """Convert the state of an event report to a payload."""
+        if int(raw_value) == TelegramSetting.ON.value:
+            return self.Value.ON
+        return self.Value.OFF
+
+    def restore(self, raw_value):
+        """Take a persisted state as payload until the output reports itself."""
+        if self.payload is None:
+            self.payload = self.from_state(raw_value)
 
     async def state(self, raw_value):
         """Set new value."""
-        if int(raw_value) == TelegramSetting.ON.value:
-            value = self.Value.ON
-        else:
-            value = self.Value.OFF
+        value = self.from_state(raw_value)
 
         updated = False
         if self.payload is None or self.payload != value:
@@ -158,22 +213,18 @@ class RemoteValue():
             self.device_name,
             self.group_addr_str())
 
+    def fields(self):
+        """Return the values compared by the equal operator."""
+        return tuple(getattr(self, name, None)
+                     for cls in type(self).__mro__ for name in getattr(cls, '__slots__', ())
+                     if name != 'after_update_cb')
+
     def __eq__(self, other):
         """Equal operator."""
-        for key, value in self.__dict__.items():
-            if key == "after_update_cb":
-                continue
-            if key not in other.__dict__:
-                return False
-            if other.__dict__[key] != value:
-                return False
-        for key, value in other.__dict__.items():
-            if key == "after_update_cb":
-                continue
-            if key not in self.__dict__:
-                return False
-        return True
+        return type(self) is type(other) and self.fields() == other.fields()
 
 class TeletaskValue():
+    __slots__ = ('value',)
+
     def __init__(self):
         self.value = 0
\ No newline at end of file
@@ -5,9 +5,12 @@ DPT 5.001.
 from enum import Enum
 
 from .remote_value import RemoteValue
+from teletask.core.acknowledgements import DEFAULT_TIMEOUT
 from teletask.doip import TelegramSetting
 
 class RemoteValueDimmer(RemoteValue):
+    __slots__ = ('range_from', 'range_to')
+
     class Value(Enum):
         """Enum for indicating the direction."""
         OFF = 0
@@ -39,13 +42,13 @@ class RemoteValueDimmer(RemoteValue):
         """Convert current payload to value."""
         return value
 
-    async def off(self):
+    async def off(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Set value to down."""
-        await self.set(self.Value.OFF.value)
+        return await self.set(self.Value.OFF.value, confirm, timeout)
 
-    async def on(self):
+    async def on(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Set value to UP."""
-        await self.set(self.Value.ON.value)
+        return await self.set(self.Value.ON.value, confirm, timeout)
 
     @property
     def unit_of_measurement(self):
@@ -8,6 +8,8 @@ from .remote_value import RemoteValue
 class RemoteValueScaling(RemoteValue):
     """Abstraction for remote value of Dimmer."""
 
+    __slots__ = ('range_from', 'range_to')
+
     def __init__(self,
                  teletask,
                  group_address=None,
@@ -34,6 +36,10 @@ class RemoteValueScaling(RemoteValue):
         """Convert current payload to value."""
         return value
 
+    def from_state(self, raw_value):
+        """Convert the state of an event report to a payload."""
+        return int(raw_value)
+
     @property
     def unit_of_measurement(self):
         """Return the unit of measurement."""
@@ -5,9 +5,12 @@ DPT 1.001.
 from enum import Enum
 
 from .remote_value import RemoteValue
+from teletask.core.acknowledgements import DEFAULT_TIMEOUT
 from teletask.doip import TelegramSetting
 
 class RemoteValueSwitch(RemoteValue):
+    __slots__ = ('invert',)
+
     class Value(Enum):
         """Enum for indicating the direction."""
         OFF = 0
@@ -35,10 +38,10 @@ class RemoteValueSwitch(RemoteValue):
         """Convert current payload to value."""
         return value
 
-    async def off(self):
+    async def off(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Set value to down."""
-        await self.set(TelegramSetting.OFF.value)
+        return await self.set(TelegramSetting.OFF.value, confirm, timeout)
 
-    async def on(self):
+    async def on(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Set value to UP."""
-        await self.set(TelegramSetting.ON.value)
\ No newline at end of file
+        return await self.set(TelegramSetting.ON.value, confirm, timeout)
\ No newline at end of file
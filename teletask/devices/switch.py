@@ -3,12 +3,16 @@ Module for managing a Switch via Teletask.
 It provides functionality for
 * switching a switch 'on' and 'off'.
 """
+from teletask.core.acknowledgements import DEFAULT_TIMEOUT
+
 from .device import Device
 from .remote_value_switch import RemoteValueSwitch
 
 class Switch(Device):
     """Class for managing a Switch."""
 
+    __slots__ = ('Switch_state', 'switch')
+
     def __init__(self,
                  teletask,
                  name,
@@ -45,19 +49,19 @@ class Switch(Device):
         """Return the current switch state of the device."""
         return self.switch.value == RemoteValueSwitch.Value.ON
 
-    async def set_on(self):
+    async def set_on(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Switch Switch on."""
-        await self.switch.on()
+        return await self.switch.on(confirm, timeout)
 
-    async def set_off(self):
+    async def set_off(self, confirm=False, timeout=DEFAULT_TIMEOUT):
         """Switch Switch off."""
-        await self.switch.off()
+        return await self.switch.off(confirm, timeout)
 
     async def change_state(self,value):
         await self.switch.state(value)
 
-    async def current_state(self):
-        await self.switch.current_state()
+    async def current_state(self, confirm=False, timeout=DEFAULT_TIMEOUT):
+        return await self.switch.current_state(confirm, timeout)
 
     async def do(self, action):
         """Execute 'do' commands."""
@@ -68,9 +72,6 @@ class Switch(Device):
         else:
             self.teletask.logger.debug("Could not understand action %s for device %s", action, self.get_name())
 
-    def has_group_address(self, var):
-        return False
-
-    def __eq__(self, other):
-        """Equal operator."""
-        return self.__dict__ == other.__dict__
\ No newline at end of file
+    def remote_values(self):
+        """Return the remote values of the device."""
+        return [self.switch]
@@ -1,7 +1,8 @@
 # from .address import GroupAddress, GroupAddressType, PhysicalAddress
 # from .address_filter import AddressFilter
 from .telegram import Telegram, TelegramSetting, TelegramFunction, TelegramCommand, TeletaskConst, TelegramHeartbeat
-from .frame import Frame, FrameQueue
+from .encoder import TelegramEncoder, TelegramCache
+from .frame import Frame, FrameBlock, FrameQueue, FrameDecoder
 # from .dpt import DPTBase, DPTBinary, DPTArray, DPTComparator, DPTWeekday
 # from .dpt_float import DPT2ByteFloat, DPT4ByteFloat, DPTLux, DPTTemperature, \
 #     DPTHumidity, DPTWsp, DPTElectricPotential, DPTElectricCurrent, DPTPower, \
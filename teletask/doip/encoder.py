@@ -0,0 +1,162 @@
+"""
+Module for encoding DoIP telegrams to their binary wire format.
+
+Every frame is START, length, command, the command parameters and a
+checksum, the sum of all preceding bytes modulo 256 (see Telegram.calc_checksum).
+The constant part of each frame is prepared once per (command, function),
+so encoding only patches address, setting and checksum.
+"""
+from collections import OrderedDict
+
+from .telegram import TeletaskConst, TelegramCommand, TelegramFunction
+from teletask.exceptions import CouldNotParseTeletaskCommand
+
+START = TeletaskConst.START.value
+CENTRAL = TeletaskConst.CENTRAL.value
+SET = TelegramCommand.SET.value
+GET = TelegramCommand.GET.value
+LOG = TelegramCommand.LOG.value
+GROUPSET = TelegramCommand.GROUPSET.value
+KEEPALIVE = TelegramCommand.KEEPALIVE.value
+
+KEEPALIVE_FRAME = bytes([START, 3, KEEPALIVE, (START + 3 + KEEPALIVE) % 256])
+
+
+class TelegramEncoder:
+    """Class for encoding telegrams to bytes."""
+
+    def __init__(self):
+        """Initialize TelegramEncoder class."""
+        self.set_templates = {}
+        self.get_templates = {}
+        self.log_frames = {}
+        self.groupset_prefixes = {}
+        for function in TelegramFunction:
+            self._prepare(function.value)
+
+    def _prepare(self, function):
+        """Prepare the templates of all commands for function."""
+        # START, length, SET, central, function, address (2 bytes), setting, checksum
+        template = bytearray([START, 8, SET, CENTRAL, function, 0, 0, 0, 0])
+        self.set_templates[function] = (template, sum(template))
+        # START, length, GET, central, function, address (2 bytes), checksum
+        template = bytearray([START, 7, GET, CENTRAL, function, 0, 0, 0])
+        self.get_templates[function] = (template, sum(template))
+        # START, length, LOG, function, state, checksum
+        self.log_frames[function] = {
+            state: bytes([START, 5, LOG, function, state, (START + 5 + LOG + function + state) % 256])
+            for state in (0, 1)}
+        # START, length, GROUPSET, central, function, number of addresses
+        prefix = bytes([START, 0, GROUPSET, CENTRAL, function])
+        self.groupset_prefixes[function] = (prefix, sum(prefix))
+
+    def encode_set(self, function, address, setting):
+        """Return SET frame for output address of function."""
+        template, base = self.set_templates[function]
+        high = (address >> 8) & 0xFF
+        low = address & 0xFF
+        template[5] = high
+        template[6] = low
+        template[7] = setting
+        template[8] = (base + high + low + setting) % 256
+        return bytes(template)
+
+    def encode_get(self, function, address):
+        """Return GET frame for output address of function."""
+        template, base = self.get_templates[function]
+        high = (address >> 8) & 0xFF
+        low = address & 0xFF
+        template[5] = high
+        template[6] = low
+        template[7] = (base + high + low) % 256
+        return bytes(template)
+
+    def encode_log(self, function, state=1):
+        """Return LOG frame (un)registering event reports of function."""
+        return self.log_frames[function][state]
+
+    def encode_groupset(self, function, addresses, setting):
+        """Return GROUPSET frame setting all addresses of function at once."""
+        prefix, base = self.groupset_prefixes[function]
+        frame = bytearray(prefix)
+        frame.append(len(addresses))
+        for address in addresses:
+            frame.append((address >> 8) & 0xFF)
+            frame.append(address & 0xFF)
+        frame.append(setting)
+        frame[1] = len(frame)
+        frame.append((base + sum(frame[5:]) + frame[1]) % 256)
+        return bytes(frame)
+
+    @staticmethod
+    def encode_keepalive():
+        """Return KEEPALIVE frame."""
+        return KEEPALIVE_FRAME
+
+    def encode(self, telegram):
+        """Return the wire bytes of a Telegram or TelegramHeartbeat."""
+        command = telegram.command
+        if command == SET:
+            return self.encode_set(telegram.function, telegram.address, telegram.setting)
+        if command == GET:
+            return self.encode_get(telegram.function, telegram.address)
+        if command == LOG:
+            return self.encode_log(telegram.function)
+        if command == GROUPSET:
+            return self.encode_groupset(telegram.function, telegram.addresses, telegram.setting)
+        if command == KEEPALIVE:
+            return KEEPALIVE_FRAME
+        raise CouldNotParseTeletaskCommand("Can not encode command {0}".format(command))
+
+
+class TelegramCache:
+    """Bounded LRU cache of encoded telegrams.
+
+    Keyed by (command, function, address, setting), returning immutable bytes
+    ready to be written to the transport.
+    """
+
+    def __init__(self, maxsize=256, encoder=None):
+        """Initialize TelegramCache class."""
+        self.maxsize = maxsize
+        self.encoder = encoder or TelegramEncoder()
+        self.frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def encode(self, telegram):
+        """Return the wire bytes of telegram, encoding it on a cache miss."""
+        if telegram.command == GROUPSET:
+            # Address lists rarely repeat, keep them out of the cache.
+            return self.encoder.encode(telegram)
+        key = (telegram.command, getattr(telegram, 'function', None),
+               getattr(telegram, 'address', None), getattr(telegram, 'setting', None))
+        frames = self.frames
+        frame = frames.get(key)
+        if frame is not None:
+            self.hits += 1
+            frames.move_to_end(key)
+            return frame
+
+        self.misses += 1
+        frame = self.encoder.encode(telegram)
+        if self.maxsize > 0:
+            frames[key] = frame
+            if len(frames) > self.maxsize:
+                frames.popitem(last=False)
+                self.evictions += 1
+        return frame
+
+    def clear(self):
+        """Remove all cached telegrams."""
+        self.frames.clear()
+
+    def __len__(self):
+        """Return number of cached telegrams."""
+        return len(self.frames)
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<TelegramCache size="{0}/{1}" hits="{2}" misses="{3}" evictions="{4}" />' \
+            .format(len(self.frames), self.maxsize, self.hits, self.misses, self.evictions)
@@ -1,62 +1,241 @@
 """
 Module for DoIP Responses.
 """
-import re
-from teletask.doip import Telegram, TelegramFunction, TelegramCommand
+from array import array
+from collections import namedtuple
 
-class FrameQueue:
-    """Initialize Telegram class."""
+from .telegram import TeletaskConst, TelegramCommand
 
+START = TeletaskConst.START.value
+EVENTREPORT = TelegramCommand.EVENTREPORT.value
+# STX, length and command are followed by the checksum.
+MIN_FRAME_LENGTH = 3
+# Central, function, address (2 bytes), error state and at least one state byte.
+MIN_EVENT_LENGTH = 9
+DEFAULT_RESYNC_WINDOW = 64
+
+_new_frame = tuple.__new__
+
+
+def frame_checksum(data, start, length):
+    """Return the checksum of the frame of length bytes at start, see Telegram.calc_checksum."""
+    return sum(data[start:start + length]) % 256
+
+
+def parse_frame(data, offset=0):
+    """Build a Frame from the verified event report starting at offset of a bytes-like object."""
+    length = data[offset + 1]
+    if length == MIN_EVENT_LENGTH:
+        state = data[offset + 8]
+    else:
+        # Sensor, motor and audio reports carry a wider state.
+        state = (data[offset + 8] << 8) | data[offset + 9]
+    return _new_frame(Frame, (EVENTREPORT,
+                              data[offset + 4],
+                              (data[offset + 5] << 8) | data[offset + 6],
+                              state,
+                              bytes(data[offset:offset + length + 1])))
 
-    def __init__(self):
-        """Initialize object."""
 
+class FrameDecoder:
+    """Incremental decoder turning a TCP byte stream into frames.
 
-    def process_frames(self,raw):
-        full_packet = ','.join(str(x) for x in raw)
-        r1 = re.findall(r"(2,9,16,([0-9]*,?){7})",full_packet)
+    One decoder lives as long as the connection it decodes. Bytes of a frame
+    that was split over several reads are kept until the rest arrives.
+    Frames are delimited by their length byte and verified by their checksum.
+    A start byte announcing more than resync_window bytes is not trusted, so
+    a corrupt byte holds up the stream for at most resync_window bytes.
+    """
 
-        result = []
-        for packet in r1:
-            frame = self.process_frame(packet[0])
-            if(frame != None):
-                result.append(frame)
+    def __init__(self, resync_window=DEFAULT_RESYNC_WINDOW):
+        """Initialize FrameDecoder class."""
+        self.resync_window = max(resync_window, MIN_EVENT_LENGTH)
+        self.buffer = bytearray()
+        self.frames_decoded = 0
+        self.frames_ignored = 0
+        self.invalid_frames = 0
+        self.bytes_discarded = 0
 
+    def feed(self, data):
+        """Append received bytes and return all frames completed by them."""
+        buffer = self.buffer
+        buffer += data
+        offsets = []
+        position = self.scan(buffer, 0, len(buffer), offsets)
+        result = [parse_frame(buffer, offset) for offset in offsets]
+        self._consume(position)
         return result
 
-    def process_frame(self,packet):
-        event = packet.split(",")
+    def feed_block(self, data):
+        """Append received bytes and return the completed frames as one FrameBlock."""
+        buffer = self.buffer
+        buffer += data
+        offsets = []
+        position = self.scan(buffer, 0, len(buffer), offsets)
+        block = FrameBlock()
+        block.extend(buffer, offsets)
+        self._consume(position)
+        return block
+
+    def _consume(self, position):
+        """Drop the bytes before position from the buffer."""
+        buffer = self.buffer
+        del buffer[:position]
+        if len(buffer) > self.resync_window:
+            # Never hold more than the resync window while waiting for data.
+            overflow = len(buffer) - self.resync_window
+            self.bytes_discarded += overflow
+            del buffer[:overflow]
+
+    def scan(self, data, position, end, offsets):
+        """Append the offsets of all complete event reports in data[position:end] to offsets.
+
+        Return the offset of the first byte that is not consumed yet.
+        """
+        find = data.find
+        max_length = self.resync_window
+        while True:
+            start = find(START, position, end)
+            if start < 0:
+                self.bytes_discarded += end - position
+                return end
+            self.bytes_discarded += start - position
+            if start + 1 >= end:
+                return start
+            length = data[start + 1]
+            if length < MIN_FRAME_LENGTH or length > max_length:
+                # Not a start byte, resync on the next one.
+                self.bytes_discarded += 1
+                position = start + 1
+                continue
+            stop = start + length + 1
+            if stop > end:
+                return start
+            if frame_checksum(data, start, length) != data[start + length]:
+                self.invalid_frames += 1
+                self.bytes_discarded += 1
+                position = start + 1
+                continue
+            if data[start + 2] != EVENTREPORT:
+                self.frames_ignored += 1
+            elif length < MIN_EVENT_LENGTH:
+                self.invalid_frames += 1
+            else:
+                offsets.append(start)
+                self.frames_decoded += 1
+            position = stop
+
+    def reset(self):
+        """Drop all buffered bytes, e.g. after the connection was lost."""
+        self.buffer.clear()
+
+
+class FrameQueue:
+    """Stateless decoder for a chunk holding only complete frames."""
+
+    def __init__(self):
+        """Initialize object."""
+        self.decoder = FrameDecoder()
+
+    @staticmethod
+    def _scannable(raw):
+        """Return raw as an object FrameDecoder.scan can search, memoryviews have no find."""
+        if isinstance(raw, memoryview):
+            # Scan the exporting object itself when the view covers all of it.
+            whole = hasattr(raw.obj, 'find') and raw.nbytes == len(raw.obj)
+            raw = raw.obj if whole else raw.tobytes()
+        return raw
+
+    def process_frames(self, raw):
+        """Return all event reports found in raw (bytes, bytearray or memoryview)."""
+        raw = self._scannable(raw)
+        offsets = []
+        self.decoder.scan(raw, 0, len(raw), offsets)
+        return [parse_frame(raw, offset) for offset in offsets]
 
-        try:
-            if(len(event) > 0):
-                payload = [x for x in event]
+    def process_block(self, raw):
+        """Return all event reports found in raw as one FrameBlock."""
+        raw = self._scannable(raw)
+        offsets = []
+        self.decoder.scan(raw, 0, len(raw), offsets)
+        block = FrameBlock()
+        block.extend(raw, offsets)
+        return block
 
-                frame = Frame(payload=payload, doip_component=int(event[4]), group_address=int(event[6]), state=int(event[8]))
-                return frame
+    def process_frame(self, packet):
+        """Return the event report at the start of packet, or None."""
+        offsets = []
+        self.decoder.scan(packet, 0, len(packet), offsets)
+        return parse_frame(packet, offsets[0]) if offsets else None
 
-        except Exception as e:
-            print(e)
 
-        return None
+class Frame(namedtuple('Frame', 'command doip_component group_address state payload')):
+    """Immutable decoded event report.
 
-class Frame:
-    command = None
-    function = None
-    group_address = None
-    payload = None
-    state = None
-    doip_component = None
-    event = None
+    doip_component holds the TelegramFunction value, group_address the
+    output number and payload the raw bytes of the frame.
+    """
 
-    def __init__(self,command = None, function = None, group_address = None, payload = None, state = None, doip_component = None):
-        self.command = command
-        self.function = function
-        self.group_address = group_address
-        self.payload = payload
-        self.state = state
-        self.doip_component = doip_component
+    __slots__ = ()
+
+    def __new__(cls, command=EVENTREPORT, function=None, group_address=None, payload=None, state=None,
+                doip_component=None):
+        """Initialize Frame class."""
+        # pylint: disable=too-many-arguments
+        if doip_component is None:
+            doip_component = function
+        return _new_frame(cls, (command, doip_component, group_address, state, payload))
+
+    @property
+    def function(self):
+        """Return the TelegramFunction value of the frame."""
+        return self.doip_component
 
     def __str__(self):
+        """Return object as readable string."""
         return '<{0} {1} {2} {3}/>' \
-            .format(self.doip_component, self.group_address, \
-                    self.payload, self.state, self.event)
\ No newline at end of file
+            .format(self.doip_component, self.group_address,
+                    self.payload, self.state)
+
+
+class FrameBlock:
+    """Array-backed batch of decoded event reports.
+
+    Function, address and state are kept in parallel columns, so a burst of
+    events does not need one object per event. Iterating yields
+    (doip_component, group_address, state) tuples.
+    """
+
+    __slots__ = ('functions', 'addresses', 'states')
+
+    def __init__(self):
+        """Initialize FrameBlock class."""
+        self.functions = array('B')
+        self.addresses = array('H')
+        self.states = array('H')
+
+    def extend(self, data, offsets):
+        """Append the verified event reports at offsets of data."""
+        functions = self.functions
+        addresses = self.addresses
+        states = self.states
+        for offset in offsets:
+            functions.append(data[offset + 4])
+            addresses.append((data[offset + 5] << 8) | data[offset + 6])
+            if data[offset + 1] == MIN_EVENT_LENGTH:
+                states.append(data[offset + 8])
+            else:
+                states.append((data[offset + 8] << 8) | data[offset + 9])
+
+    def __len__(self):
+        """Return number of events within block."""
+        return len(self.functions)
+
+    def __iter__(self):
+        """Iterate over (doip_component, group_address, state) tuples."""
+        return zip(self.functions, self.addresses, self.states)
+
+    def frame(self, index):
+        """Return the event at index as Frame."""
+        return _new_frame(Frame, (EVENTREPORT, self.functions[index], self.addresses[index],
+                                  self.states[index], None))
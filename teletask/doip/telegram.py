@@ -41,11 +41,18 @@ class TelegramSetting(Enum):
 class Telegram:
     """Class for DoIP telegrams."""
 
-    def __init__(self,command=None,function=None,address=None,setting=None):
-        """Initialize Telegram class."""
+    def __init__(self,command=None,function=None,address=None,setting=None,addresses=None):
+        """Initialize Telegram class.
+
+        GROUPSET telegrams take a list of addresses instead of a single address.
+        """
         self.start = TeletaskConst.START.value
         self.length = 0
         self.command = None
+        self.function = None if function is None else function.value
+        self.address = address
+        self.setting = getattr(setting, 'value', setting)
+        self.addresses = None
         self.payload = {}
 
         if(str(command) == "TelegramCommand.LOG"):
@@ -62,21 +69,30 @@ class Telegram:
 
             if(function!=None):
               self.payload[1] = function.value
+        elif(str(command) == "TelegramCommand.GROUPSET"):
+            self.addresses = tuple(addresses or ())
+            self.payload[0] = 1
+            self.payload[1] = function.value
+            self.payload[2] = len(self.addresses)
+            for address in self.addresses:
+                self.payload[len(self.payload)] = (address >> 8) & 0xFF
+                self.payload[len(self.payload)] = address & 0xFF
+            self.payload[len(self.payload)] = self.setting
         else:
             raise CouldNotParseTeletaskCommand
 
         if(command!=None):
             self.command = command.value
 
-        if(setting!=None):
+        if(setting!=None and self.addresses is None):
             self.payload[2] = 0
             self.payload[3] = address
-            self.payload[4] = setting.value
+            self.payload[4] = self.setting
 
         self.checksum = 0
 
     def to_teletask(self):
-        print(str(self))
+        """Return object in the comma separated text format."""
         return str(self)
 
     def __str__(self):
@@ -117,6 +133,7 @@ class TelegramHeartbeat:
         """Initialize Telegram class."""
 
         self.content = TelegramCommand.KEEPALIVE
+        self.command = TelegramCommand.KEEPALIVE.value
 
     def to_teletask(self):
         return str(self)
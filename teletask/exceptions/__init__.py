@@ -1,4 +1,4 @@
 """Module for Teletask Exception handling."""
 from .exception import TeletaskException, ConversionError, \
     CouldNotParseTelegram, CouldNotParseTeletaskIP, CouldNotParseAddress, \
-    DeviceIllegalValue, CouldNotParseTeletaskCommand
\ No newline at end of file
+    DeviceIllegalValue, CouldNotParseTeletaskCommand, CommandNotAcknowledged
\ No newline at end of file
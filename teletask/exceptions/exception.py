@@ -35,7 +35,7 @@ class CouldNotParseTeletaskCommand(TeletaskException):
 
     def __init__(self, description=""):
         """Initialize CouldNotParseTeletaskCommand class."""
-        super(CouldNotParseTeletaskIP, self).__init__("Could not parse Teletask Command")
+        super(CouldNotParseTeletaskCommand, self).__init__("Could not parse Teletask Command")
         self.description = description
 
     def __str__(self):
@@ -100,4 +100,21 @@ class DeviceIllegalValue(TeletaskException):
         """Return object as readable string."""
         return '<DeviceIllegalValue description="{0}" value="{1}" />'.format(
             self.value,
-            self.description)
\ No newline at end of file
+            self.description)
+
+class CommandNotAcknowledged(TeletaskException):
+    """Exception class for a command the central unit did not confirm in time."""
+
+    def __init__(self, function, address, timeout):
+        """Initialize CommandNotAcknowledged class."""
+        super(CommandNotAcknowledged, self).__init__("Command not acknowledged")
+        self.function = function
+        self.address = address
+        self.timeout = timeout
+
+    def __str__(self):
+        """Return object as readable string."""
+        return '<CommandNotAcknowledged function="{0}" address="{1}" timeout="{2}" />'.format(
+            self.function,
+            self.address,
+            self.timeout)
@@ -9,7 +9,7 @@ import binascii
 import time
 
 #from teletask.exceptions import CouldNotParseTeletaskIP, XTeletaskException
-from teletask.doip import Frame, FrameQueue
+from teletask.doip import Frame, FrameDecoder
 
 
 class Client:
@@ -31,16 +31,47 @@ class Client:
                 len(self.service_types) == 0 or \
                 service_type in self.service_types
 
+    class WriteStatistics:
+        """Counters of the outgoing write buffer."""
+
+        def __init__(self):
+            """Initialize WriteStatistics class."""
+            self.telegrams = 0
+            self.flushes = 0
+            self.bytes = 0
+            self.total_flush_latency = 0.0
+            self.max_flush_latency = 0.0
+
+        @property
+        def average_flush_latency(self):
+            """Return average time a telegram waited in the write buffer."""
+            if not self.flushes:
+                return 0.0
+            return self.total_flush_latency / self.flushes
+
+        def __str__(self):
+            """Return object as readable string."""
+            return '<WriteStatistics telegrams="{0}" flushes="{1}" bytes="{2}" ' \
+                'average_flush_latency="{3:.6f}" max_flush_latency="{4:.6f}" />' \
+                .format(self.telegrams, self.flushes, self.bytes,
+                        self.average_flush_latency, self.max_flush_latency)
+
     class ClientFactory(asyncio.Protocol):
         """Abstraction for managing the asyncio-tcp transports."""
 
         def __init__(self,
                      host, port,
-                     data_received_callback=None,teletask=None):
+                     data_received_callback=None,teletask=None,
+                     pause_writing_callback=None, resume_writing_callback=None,
+                     connection_lost_callback=None):
             """Initialize ClientFactory class."""
+            # pylint: disable=too-many-arguments
             self.host = host
             self.port = port
             self.data_received_callback = data_received_callback
+            self.pause_writing_callback = pause_writing_callback
+            self.resume_writing_callback = resume_writing_callback
+            self.connection_lost_callback = connection_lost_callback
             self.teletask = teletask
 
         def connection_made(self, transport):
@@ -52,6 +83,16 @@ class Client:
             if self.data_received_callback is not None:
                 self.data_received_callback(data)
 
+        def pause_writing(self):
+            """Call assigned callback. Callback for transport buffer above high-water mark."""
+            if self.pause_writing_callback is not None:
+                self.pause_writing_callback()
+
+        def resume_writing(self):
+            """Call assigned callback. Callback for transport buffer drained below low-water mark."""
+            if self.resume_writing_callback is not None:
+                self.resume_writing_callback()
+
         def error_received(self, exc):
             """Handle errors. Callback for error received."""
             if hasattr(self, 'teletask'):
@@ -61,23 +102,47 @@ class Client:
             """Log error. Callback for connection lost."""
             if hasattr(self, 'teletask'):
                 self.teletask.logger.info('closing transport %s', exc)
+            if self.connection_lost_callback is not None:
+                self.connection_lost_callback(self, exc)
         
         def send(self,msg):
             self.transport.write(msg)
 
-    def __init__(self, teletask, host, port, telegram_received_callback=None):
-        """Initialize Client class."""
+    def __init__(self, teletask, host, port, telegram_received_callback=None,
+                 write_window=0.0, write_threshold=1024, connection_lost_callback=None):
+        """Initialize Client class.
+
+        Telegrams sent within write_window seconds are written to the transport
+        at once, unless write_threshold bytes are pending before that.
+        A write_window of 0 flushes at the end of the current loop iteration.
+        connection_lost_callback is called with the exception, if any, when the
+        connection drops without stop or close being called.
+        """
+        # pylint: disable=too-many-arguments
         self.teletask = teletask
         self.host = host
         self.port = port
         self.callbacks = []
+        self.frame_decoder = FrameDecoder()
+        self.reader = None
+        self.writer = None
+        self.write_window = write_window
+        self.write_threshold = write_threshold
+        self.write_buffer = bytearray()
+        self.write_statistics = Client.WriteStatistics()
+        self.writing_paused = False
+        self._flush_handle = None
+        self._first_buffered = None
+        self.last_sent = None
+        self.last_received = None
+        self.connection_lost_callback = connection_lost_callback
 
     def data_received_callback(self, raw):
         """Parse and process Teletask frame. Callback for having received an TCP packet."""
         if raw:
+            self.last_received = self.teletask.loop.time()
             try:
-                frame_queue = FrameQueue()
-                frames = frame_queue.process_frames(raw)
+                frames = self.frame_decoder.feed(raw)
                 for frame in frames:
                     self.teletask.logger.info("Received: %s", frame)
                     self.handle_teletaskframe(frame)
@@ -106,7 +171,12 @@ class Client:
 
     async def connect(self):
         """Connect TCP socket. Open UDP port and build mulitcast socket if necessary."""
-        client_factory = Client.ClientFactory(host=self.host, port=self.port, data_received_callback=self.data_received_callback, teletask=self.teletask)
+        self.frame_decoder.reset()
+        self.writing_paused = False
+        client_factory = Client.ClientFactory(host=self.host, port=self.port, data_received_callback=self.data_received_callback, teletask=self.teletask,
+                                              pause_writing_callback=self.pause_writing,
+                                              resume_writing_callback=self.resume_writing,
+                                              connection_lost_callback=self.connection_lost)
         
         (reader, writer) = await self.teletask.loop.create_connection(
             lambda: client_factory,
@@ -115,19 +185,102 @@ class Client:
 
         self.reader = reader
         self.writer = writer
+        self.last_received = self.teletask.loop.time()
         
 
     async def send_telegram(self,frame):
         self.send(frame)
 
     def send(self, frame):
-        """Send Frame to socket."""
+        """Queue Frame in the write buffer of the socket."""
         self.teletask.logger.info("Sending: %s", frame)
-        self.writer.send(frame.to_teletask().encode())
-        #time.sleep(0.2)
+        buffer = self.write_buffer
+        if not buffer:
+            self._first_buffered = self.teletask.loop.time()
+        buffer += self.teletask.telegram_cache.encode(frame)
+        self.write_statistics.telegrams += 1
+
+        if len(buffer) >= self.write_threshold:
+            self.flush()
+        elif self._flush_handle is None:
+            if self.write_window > 0:
+                self._flush_handle = self.teletask.loop.call_later(self.write_window, self.flush)
+            else:
+                self._flush_handle = self.teletask.loop.call_soon(self.flush)
+
+    def flush(self):
+        """Write all buffered telegrams to the socket in a single write."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self.write_buffer or self.writing_paused or self.writer is None:
+            # Flushed again by resume_writing or after (re)connecting.
+            return
+
+        data = bytes(self.write_buffer)
+        self.write_buffer.clear()
+        self.writer.send(data)
+
+        self.last_sent = self.teletask.loop.time()
+        latency = self.last_sent - self._first_buffered
+        statistics = self.write_statistics
+        statistics.flushes += 1
+        statistics.bytes += len(data)
+        statistics.total_flush_latency += latency
+        statistics.max_flush_latency = max(statistics.max_flush_latency, latency)
+
+    def pause_reading(self):
+        """Stop reading from the socket until resume_reading is called."""
+        if self.reader is not None:
+            self.reader.pause_reading()
+
+    def resume_reading(self):
+        """Continue reading from the socket."""
+        if self.reader is not None:
+            self.reader.resume_reading()
+
+    def pause_writing(self):
+        """Hold back writes while the transport buffer is full."""
+        self.writing_paused = True
+
+    def resume_writing(self):
+        """Write everything buffered while the transport was paused."""
+        self.writing_paused = False
+        self.flush()
+
+    @property
+    def connected(self):
+        """Return if the socket is connected."""
+        return self.writer is not None
+
+    def connection_lost(self, protocol, exc):
+        """Forget the transport and report the loss. Callback for the connection being lost."""
+        if protocol is not self.writer:
+            # A transport closed on purpose, or replaced by a newer connection.
+            return
+        self._forget_transport()
+        if self.connection_lost_callback is not None:
+            self.connection_lost_callback(exc)
+
+    def close(self):
+        """Close the socket, dropping what was not written yet."""
+        transport = self.reader
+        self._forget_transport()
+        if transport is not None:
+            transport.close()
+
+    def _forget_transport(self):
+        """Drop transport and the telegrams buffered for it."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self.write_buffer.clear()
+        self.writing_paused = False
+        self.reader = None
+        self.writer = None
 
     async def stop(self):
         """Stop TCP socket."""
-        self.reader.close()
-        self.reader.writer()
+        self.flush()
+        self.close()
         
\ No newline at end of file
@@ -3,27 +3,94 @@ TeletaskDoIPInterface manages Teletask/DoIP connections.
 * It searches for available devices and connects with the corresponding connect method.
 * It passes Teletask telegrams from the network and
 * provides callbacks after having received a telegram from the network.
+* It supervises the connection: a lost or dead link is reconnected with
+  jittered exponential backoff. Outgoing telegrams are held meanwhile and
+  replayed unless their time to live passed, and the LOG registrations
+  are restored. Both go through the outgoing scheduler, so coalescing and
+  the rate limiter apply to them like to any other telegram.
 """
+import asyncio
+import random
+from collections import OrderedDict, deque
 from enum import Enum
 from platform import system as get_os_name
 
 from .client import Client
 
+from teletask.doip import Telegram, TelegramCommand, TelegramFunction
 from teletask.exceptions import TeletaskException
 
+LOG = TelegramCommand.LOG.value
+KEEPALIVE = TelegramCommand.KEEPALIVE.value
+RECONNECT_INITIAL_WAIT = 0.5
+
+
 class TeletaskDoIPInterface():
     """Class for managing Teletask/DoIP Tunneling or Routing connections."""
 
-    def __init__(self, teletask):
-        """Initialize TeletaskDoIPInterface class."""
+    class ConnectionStatistics:
+        """Counters of lost connections and reconnects."""
+
+        def __init__(self):
+            """Initialize ConnectionStatistics class."""
+            self.connection_losses = 0
+            self.reconnects = 0
+            self.reconnect_attempts = 0
+            self.last_reconnect_time = 0.0
+            self.last_outage = 0.0
+            self.total_outage = 0.0
+            self.max_outage = 0.0
+            self.held = 0
+            self.replayed = 0
+            self.expired = 0
+            self.overflowed = 0
+
+        def __str__(self):
+            """Return object as readable string."""
+            return '<ConnectionStatistics connection_losses="{0}" reconnects="{1}" reconnect_attempts="{2}" ' \
+                'last_reconnect_time="{3:.3f}" last_outage="{4:.3f}" total_outage="{5:.3f}" ' \
+                'max_outage="{6:.3f}" held="{7}" replayed="{8}" expired="{9}" overflowed="{10}" />' \
+                .format(self.connection_losses, self.reconnects, self.reconnect_attempts,
+                        self.last_reconnect_time, self.last_outage, self.total_outage,
+                        self.max_outage, self.held, self.replayed, self.expired,
+                        self.overflowed)
+
+    def __init__(self, teletask, telegram_ttl=30.0, held_telegrams=1024):
+        """Initialize TeletaskDoIPInterface class.
+
+        While disconnected up to held_telegrams outgoing telegrams are held,
+        those older than telegram_ttl seconds are dropped on reconnect.
+        """
         self.teletask = teletask
+        self.interface = None
+        self.auto_reconnect = False
+        self.auto_reconnect_wait = None
+        self.telegram_ttl = telegram_ttl
+        self.held_telegrams = deque(maxlen=held_telegrams)
+        self.log_functions = OrderedDict()
+        self.statistics = TeletaskDoIPInterface.ConnectionStatistics()
+        self.reconnect_task = None
+        self.disconnected_at = None
+        self.stopping = False
 
     async def start(self, host, port, auto_reconnect, auto_reconnect_wait):
-        """Start Teletask/DoIP."""
+        """Start Teletask/DoIP.
+
+        With auto_reconnect a lost connection is reestablished, waiting up to
+        auto_reconnect_wait seconds between attempts.
+        """
         self.teletask.logger.debug("Starting to %s:%s ", host, port)
-        self.interface = Client(self.teletask,host,port,telegram_received_callback=self.telegram_received)
-        
+        self.auto_reconnect = auto_reconnect
+        self.auto_reconnect_wait = auto_reconnect_wait
+        self.stopping = False
+        self.interface = Client(self.teletask,host,port,telegram_received_callback=self.telegram_received,
+                                write_window=self.teletask.write_window,
+                                write_threshold=self.teletask.write_threshold,
+                                connection_lost_callback=self.connection_lost)
+
         self.interface.register_callback(self.response_rec_callback)
+        self.teletask.incoming_telegrams.pause_producer_cb = self.interface.pause_reading
+        self.teletask.incoming_telegrams.resume_producer_cb = self.interface.resume_reading
 
         await self.interface.connect()
 
@@ -31,16 +98,113 @@ class TeletaskDoIPInterface():
         """Verify and handle doipframe. Callback from internal client."""
         self.telegram_received(frame)
 
+    @property
+    def connected(self):
+        """Return if the central unit is connected."""
+        return self.interface is not None and self.interface.connected
+
+    @property
+    def last_sent(self):
+        """Return loop time of the last write to the central unit."""
+        return None if self.interface is None else self.interface.last_sent
+
+    @property
+    def last_received(self):
+        """Return loop time of the last data received from the central unit, or of connecting."""
+        return None if self.interface is None else self.interface.last_received
+
+    def connection_lost(self, exc=None):
+        """Close the connection and start reconnecting. Callback for a lost or dead link."""
+        if self.stopping or self.interface is None or self.reconnect_task is not None:
+            return
+        self.teletask.logger.warning("Connection to %s:%s lost: %s", self.interface.host, self.interface.port, exc)
+        self.statistics.connection_losses += 1
+        self.disconnected_at = self.teletask.loop.time()
+        self.interface.close()
+        if self.auto_reconnect:
+            self.reconnect_task = self.teletask.loop.create_task(self.reconnect())
+
+    def backoff(self, attempt):
+        """Return seconds to wait before reconnect attempt, doubling up to auto_reconnect_wait with jitter."""
+        wait = RECONNECT_INITIAL_WAIT * 2 ** min(attempt, 16)
+        if self.auto_reconnect_wait is not None:
+            wait = min(wait, self.auto_reconnect_wait)
+        return wait * random.uniform(0.5, 1.0)
+
+    async def reconnect(self):
+        """Reconnect until it succeeds, then restore LOG registrations and replay held telegrams."""
+        attempt = 0
+        try:
+            while True:
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                self.statistics.reconnect_attempts += 1
+                started = self.teletask.loop.time()
+                try:
+                    await self.interface.connect()
+                    break
+                except OSError as ex:
+                    self.teletask.logger.info("Reconnect attempt %s failed: %s", attempt, ex)
+
+            for function in list(self.log_functions):
+                await self.teletask.telegrams.put(Telegram(command=TelegramCommand.LOG,
+                                                           function=TelegramFunction(function)))
+            await self.replay()
+
+            now = self.teletask.loop.time()
+            outage = now - self.disconnected_at
+            statistics = self.statistics
+            statistics.reconnects += 1
+            statistics.last_reconnect_time = now - started
+            statistics.last_outage = outage
+            statistics.total_outage += outage
+            statistics.max_outage = max(statistics.max_outage, outage)
+            self.teletask.logger.warning("Reconnected to %s:%s after %.3f seconds",
+                                         self.interface.host, self.interface.port, outage)
+        finally:
+            self.reconnect_task = None
+
+    def hold(self, telegram):
+        """Keep telegram to send it after reconnecting."""
+        if len(self.held_telegrams) == self.held_telegrams.maxlen:
+            self.statistics.overflowed += 1
+        self.held_telegrams.append((telegram, self.teletask.loop.time() + self.telegram_ttl))
+        self.statistics.held += 1
+
+    async def replay(self):
+        """Queue held telegrams whose time to live did not pass for sending."""
+        now = self.teletask.loop.time()
+        while self.held_telegrams:
+            telegram, expires_at = self.held_telegrams.popleft()
+            if expires_at < now:
+                self.statistics.expired += 1
+                continue
+            await self.teletask.telegrams.put(telegram)
+            self.statistics.replayed += 1
+
     async def stop(self):
         """Stop connected interfae."""
+        self.stopping = True
+        if self.reconnect_task is not None:
+            self.reconnect_task.cancel()
+            self.reconnect_task = None
         if self.interface is not None:
             await self.interface.stop()
             self.interface = None
 
     def telegram_received(self, telegram):
         """Put received telegram into queue. Callback for having received telegram."""
-        self.teletask.loop.create_task(self.teletask.telegrams.put(telegram))
+        self.teletask.incoming_telegrams.put_nowait(telegram)
 
     async def send_telegram(self, telegram):
-        """Send telegram to connected device."""
-        await self.interface.send_telegram(telegram)
\ No newline at end of file
+        """Send telegram to connected device, or hold it while reconnecting."""
+        command = getattr(telegram, 'command', None)
+        if command == LOG:
+            # Restored on reconnect.
+            self.log_functions[telegram.function] = True
+        if self.connected:
+            await self.interface.send_telegram(telegram)
+        elif command == KEEPALIVE:
+            return
+        elif command != LOG:
+            self.hold(telegram)
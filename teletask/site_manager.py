@@ -0,0 +1,165 @@
+"""
+Module for connecting to many central units from one process.
+
+Each site is a Teletask instance with its own connection, queues, devices
+and state table, all running on the event loop of the manager. The
+received frames of all sites are dispatched by one shared task instead of
+a task per site. The telegram cache and the process pool are shared as
+well. Devices are looked up per site, and statistics are reported per site.
+
+The outgoing queue, heartbeat and state table are still kept per site, so
+the cost grows linearly with the number of sites.
+"""
+import asyncio
+
+from teletask.core import IncomingDispatcher
+from teletask.doip import TelegramCache
+
+from .client import Teletask
+
+
+class SiteManager:
+    """Class for managing the connections to many central units on one event loop."""
+
+    class SiteStatistics:
+        """Snapshot of the counters of one site."""
+
+        # pylint: disable=too-many-instance-attributes
+        def __init__(self, name, teletask):
+            """Initialize SiteStatistics class."""
+            interface = teletask.teletaskip_interface
+            client = None if interface is None else interface.interface
+            self.name = name
+            self.connected = interface is not None and interface.connected
+            self.frames_received = 0 if client is None else client.frame_decoder.frames_decoded
+            self.telegrams_sent = 0 if client is None else client.write_statistics.telegrams
+            self.bytes_sent = 0 if client is None else client.write_statistics.bytes
+            self.outgoing_depth = teletask.telegrams.qsize()
+            self.incoming_depth = teletask.incoming_telegrams.qsize()
+            self.connection_losses = 0 if interface is None else interface.statistics.connection_losses
+            self.reconnects = 0 if interface is None else interface.statistics.reconnects
+            self.total_outage = 0.0 if interface is None else interface.statistics.total_outage
+            self.keepalive_rtt = teletask.heartbeat.average_rtt
+            self.acknowledgement_latency = teletask.acknowledgements.average_latency
+            self.devices = len(teletask.devices)
+
+        def __str__(self):
+            """Return object as readable string."""
+            return '<SiteStatistics name="{0}" connected="{1}" frames_received="{2}" telegrams_sent="{3}" ' \
+                'bytes_sent="{4}" outgoing_depth="{5}" incoming_depth="{6}" connection_losses="{7}" ' \
+                'reconnects="{8}" total_outage="{9:.3f}" keepalive_rtt="{10:.6f}" ' \
+                'acknowledgement_latency="{11:.6f}" devices="{12}" />' \
+                .format(self.name, self.connected, self.frames_received, self.telegrams_sent,
+                        self.bytes_sent, self.outgoing_depth, self.incoming_depth, self.connection_losses,
+                        self.reconnects, self.total_outage, self.keepalive_rtt,
+                        self.acknowledgement_latency, self.devices)
+
+    def __init__(self, loop=None, telegram_cache_size=1024, **defaults):
+        """Initialize SiteManager class.
+
+        defaults are keyword arguments of Teletask applied to every site.
+        """
+        self.loop = loop or asyncio.get_event_loop()
+        self.telegram_cache = TelegramCache(telegram_cache_size)
+        self.dispatcher = IncomingDispatcher(self.loop)
+        self.defaults = defaults
+        self.sites = {}
+        self.addresses = {}
+        self.failed = {}
+        self.telegram_received_cbs = []
+
+    def add_site(self, name, host, port, **options):
+        """Add central unit at host and port as site name. Return its Teletask instance.
+
+        options are keyword arguments of Teletask overriding the defaults.
+        """
+        if name in self.sites:
+            raise KeyError("Site {0} already exists".format(name))
+        arguments = dict(self.defaults)
+        arguments.update(options)
+        arguments['loop'] = self.loop
+        arguments['telegram_cache'] = self.telegram_cache
+        teletask = Teletask(**arguments)
+        self.dispatcher.add(teletask)
+        for telegram_received_cb in self.telegram_received_cbs:
+            self._subscribe(name, teletask, telegram_received_cb)
+        self.sites[name] = teletask
+        self.addresses[name] = (host, port)
+        return teletask
+
+    async def remove_site(self, name):
+        """Stop and remove site name."""
+        teletask = self.sites.pop(name)
+        del self.addresses[name]
+        self.failed.pop(name, None)
+        if teletask.started:
+            await teletask.stop()
+        self.dispatcher.remove(teletask)
+
+    def register_telegram_received_cb(self, telegram_received_cb):
+        """Register callback called with (site name, frame) for the frames received by every site."""
+        self.telegram_received_cbs.append(telegram_received_cb)
+        for name, teletask in self.sites.items():
+            self._subscribe(name, teletask, telegram_received_cb)
+        return telegram_received_cb
+
+    @staticmethod
+    def _subscribe(name, teletask, telegram_received_cb):
+        """Subscribe telegram_received_cb to all frames of site name."""
+        async def site_telegram_received(frame):
+            """Add the site name to the frame."""
+            return await telegram_received_cb(name, frame)
+        teletask.telegram_queue.register_telegram_received_cb(site_telegram_received)
+
+    async def start(self, concurrency=32):
+        """Connect all sites, at most concurrency at a time.
+
+        Sites failing to connect are left in failed instead of stopping the others.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        self.dispatcher.start()
+
+        async def start_site(name, teletask):
+            """Connect a single site."""
+            async with semaphore:
+                host, port = self.addresses[name]
+                try:
+                    await teletask.start(host, port)
+                    self.failed.pop(name, None)
+                except OSError as ex:
+                    teletask.logger.error("Could not connect site %s to %s:%s: %s", name, host, port, ex)
+                    self.failed[name] = ex
+
+        await asyncio.gather(*(start_site(name, teletask) for name, teletask in self.sites.items()
+                               if not teletask.started))
+
+    async def stop(self):
+        """Stop all sites."""
+        await asyncio.gather(*(teletask.stop() for teletask in self.sites.values() if teletask.started))
+        await self.dispatcher.stop()
+
+    def __getitem__(self, name):
+        """Return Teletask instance of site name."""
+        return self.sites[name]
+
+    def __contains__(self, name):
+        """Return if site name exists."""
+        return name in self.sites
+
+    def __iter__(self):
+        """Iterate over site names."""
+        return iter(self.sites)
+
+    def __len__(self):
+        """Return number of sites."""
+        return len(self.sites)
+
+    def device(self, site, name):
+        """Return device name of site."""
+        return self.sites[site].devices[name]
+
+    def statistics(self, name=None):
+        """Return SiteStatistics of site name, or a dict of them for all sites."""
+        if name is not None:
+            return SiteManager.SiteStatistics(name, self.sites[name])
+        return {site: SiteManager.SiteStatistics(site, teletask) for site, teletask in self.sites.items()}